@@ -3,18 +3,21 @@ Sistema de Alertas - Versão Simplificada
 Envia alertas por email quando vulnerabilidades críticas são encontradas
 """
 
-import smtplib
 import pandas as pd
 from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
 from datetime import datetime
+from functools import partial
 import os
 import sys
 
 # Importar configurações
 try:
-    from .email_config import EMAIL_CONFIG, is_configured
+    from .email_config import EMAIL_CONFIG, ALERT_CONFIG, is_configured
+    from .smtp_session import get_session
+    from .alert_dispatcher import get_dispatcher, flush_spool
+    from .alert_routing import split_by_recipient
+    from .suppression_store import suppress_repeated, mark_alerted
+    from .alert_render import console_text, email_body, csv_attachment
     EMAIL_WORKING = is_configured()
 except ImportError:
     try:
@@ -22,11 +25,34 @@ except ImportError:
         import sys
         import os
         sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-        from email_config import EMAIL_CONFIG, is_configured
+        from email_config import EMAIL_CONFIG, ALERT_CONFIG, is_configured
+        from smtp_session import get_session
+        from alert_dispatcher import get_dispatcher, flush_spool
+        from alert_routing import split_by_recipient
+        from suppression_store import suppress_repeated, mark_alerted
+        from alert_render import console_text, email_body, csv_attachment
         EMAIL_WORKING = is_configured()
     except ImportError:
         EMAIL_CONFIG = None
+        ALERT_CONFIG = {}
         EMAIL_WORKING = False
+        
+        # Sem os módulos de alerta: apenas console, sem histórico de supressão
+        def suppress_repeated(critical_df):
+            return critical_df, 0
+        
+        def mark_alerted(critical_df):
+            pass
+        
+        def console_text(critical_df):
+            return '\n'.join(f"• {row['name']} | {row['host']} | Severidade: {float(row['severity']):.1f}"
+                             for _, row in critical_df.iterrows())
+
+
+def resend_pending_alerts():
+    """Reenvia os emails que ficaram no spool (mesmo sem alertas novos nesta execução)"""
+    if EMAIL_WORKING:
+        flush_spool()
 
 
 def send_alert(critical_df):
@@ -35,49 +61,91 @@ def send_alert(critical_df):
         print("✅ Nenhuma vulnerabilidade crítica encontrada.")
         return
     
+    # Não repetir alertas já enviados dentro do TTL ou reconhecidos
+    critical_df, suppressed = suppress_repeated(critical_df)
+    if suppressed:
+        print(f"🔕 {suppressed} vulnerabilidades críticas já alertadas recentemente ou reconhecidas - suprimidas")
+    if critical_df.empty:
+        print("✅ Nenhuma vulnerabilidade crítica nova para alertar.")
+        return
+    
     # Mostrar alerta no console sempre
     print(f"\n🚨 ALERTA: {len(critical_df)} vulnerabilidades críticas!")
     print("=" * 50)
-    for _, vuln in critical_df.iterrows():
-        print(f"• {vuln['name']} | {vuln['host']} | Severidade: {vuln['severity']}")
+    print(console_text(critical_df))
     print("=" * 50)
     print("🚀 AÇÃO REQUERIDA: Corrija imediatamente!")
     
     # Tentar email se configurado
     if EMAIL_WORKING:
         try:
-            _send_email(critical_df)
-            print(f"\n📧 ✅ Alerta enviado por email: {len(critical_df)} vulnerabilidades críticas")
+            count = _send_email(critical_df)
+            recipients = f" ({count} destinatários)" if count > 1 else ""
+            if ALERT_CONFIG.get('background', True):
+                print(f"\n📧 Alerta enfileirado para envio em segundo plano: {len(critical_df)} vulnerabilidades críticas{recipients}")
+            else:
+                print(f"\n📧 ✅ Alerta enviado por email: {len(critical_df)} vulnerabilidades críticas{recipients}")
         except Exception as e:
+            # Não registrado: o alerta é repetido na próxima execução
             print(f"\n❌ Erro no email: {e}")
             print("📺 Alerta exibido acima no console")
     else:
         print("\n📺 📧 Email não configurado - usando apenas console")
         print("💡 Para receber por email: python alerting/setup_email.py")
+        # Sem email, o console é o alerta
+        mark_alerted(critical_df)
 
 
 def _send_email(critical_df):
-    # Email básico
+    """
+    Envia um resumo por destinatário (rotas em ALERT_ROUTES_FILE)
+    
+    Cada grupo só é registrado no histórico de alertas depois de entregue
+    (ou gravado no spool); linhas sem destinatário não são registradas.
+    
+    Returns:
+        int: Quantidade de emails enviados ou enfileirados (ALERT_BACKGROUND)
+    """
+    groups = split_by_recipient(critical_df)
+    messages = [_build_email(group, recipient) for recipient, group in groups]
+    
+    if ALERT_CONFIG.get('background', True):
+        # Não bloqueia o pipeline; main() aguarda a fila no final
+        dispatcher = get_dispatcher()
+        for message, (_, group) in zip(messages, groups):
+            dispatcher.submit(message, on_handoff=partial(mark_alerted, group))
+        return len(messages)
+    
+    # Enviar pela sessão SMTP compartilhada (uma autenticação por execução)
+    errors = []
+    for (_, _, error), (_, group) in zip(get_session().send_batch(messages), groups):
+        if error:
+            errors.append(error)
+        else:
+            mark_alerted(group)
+    if errors:
+        raise errors[0]
+    return len(messages)
+
+
+def _build_email(critical_df, recipient=None):
+    # Email básico (corpo com as mais severas; lista completa no anexo)
     msg = MIMEText(f"""🚨 ALERTA DE SEGURANÇA
 
 {len(critical_df)} vulnerabilidades críticas encontradas!
 
 Vulnerabilidades:
-{critical_df[['name', 'host', 'severity']].to_string()}
+{email_body(critical_df)}
 
 ⚠️  AÇÃO IMEDIATA NECESSÁRIA!
 """)
     
     msg['From'] = EMAIL_CONFIG['email']
-    msg['To'] = EMAIL_CONFIG['destination']
+    msg['To'] = recipient or EMAIL_CONFIG['destination']
     msg['Subject'] = f"🚨 ALERTA - {len(critical_df)} Vulnerabilidades Críticas"
     
-    # Anexar CSV
-    csv_data = critical_df.to_csv(index=False)
-    attachment = MIMEBase('text', 'csv')
-    attachment.set_payload(csv_data.encode())
-    encoders.encode_base64(attachment)
-    attachment.add_header('Content-Disposition', 'attachment; filename=vulnerabilidades.csv')
+    # Anexar CSV (compactado se for grande)
+    attachment = csv_attachment(critical_df)
     
     # Criar mensagem completa
     from email.mime.multipart import MIMEMultipart
@@ -87,23 +155,7 @@ Vulnerabilidades:
     full_msg['Subject'] = msg['Subject']
     full_msg.attach(msg)
     full_msg.attach(attachment)
-    
-    # Enviar
-    server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-    server.starttls()
-    server.login(EMAIL_CONFIG['email'], EMAIL_CONFIG['password'])
-    server.sendmail(EMAIL_CONFIG['email'], EMAIL_CONFIG['destination'], full_msg.as_string())
-    server.quit()
-
-
-def _console_alert(critical_df):
-    """Alerta no console"""
-    print(f"\n🚨 ALERTA: {len(critical_df)} vulnerabilidades críticas!")
-    print("=" * 50)
-    for _, vuln in critical_df.iterrows():
-        print(f"• {vuln['name']} | {vuln['host']} | Severidade: {vuln['severity']}")
-    print("=" * 50)
-    print("🚀 AÇÃO REQUERIDA: Corrija imediatamente!")
+    return full_msg
 
 
 def send_summary_alert(stats):
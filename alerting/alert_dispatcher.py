@@ -0,0 +1,264 @@
+"""
+Envio de Alertas em Segundo Plano
+Fila em memória + threads de envio com tentativas e backoff; mensagens
+não entregues vão para um spool em disco e são reenviadas na próxima execução
+"""
+
+import os
+import time
+import uuid
+import queue
+import atexit
+import threading
+from email import message_from_bytes
+
+try:
+    from .email_config import ALERT_CONFIG
+    from .smtp_session import SMTPSession
+except ImportError:
+    try:
+        # Fallback para importação absoluta
+        import sys
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from email_config import ALERT_CONFIG
+        from smtp_session import SMTPSession
+    except ImportError:
+        ALERT_CONFIG = {}
+        SMTPSession = None
+
+
+class AlertDispatcher:
+    """
+    Despacha mensagens de email em threads, sem bloquear o pipeline
+    """
+
+    def __init__(self, workers=None, retries=None, backoff=None, spool_dir=None, session_factory=None):
+        self.workers = workers or ALERT_CONFIG.get('workers', 1)
+        self.retries = retries if retries is not None else ALERT_CONFIG.get('max_retries', 3)
+        self.backoff = backoff if backoff is not None else ALERT_CONFIG.get('retry_backoff', 2.0)
+        self.spool_dir = spool_dir or ALERT_CONFIG.get('spool_dir', 'reports/alert_spool')
+        self.session_factory = session_factory or SMTPSession
+
+        self.queue = queue.Queue()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.in_flight = {}  # thread -> item em envio
+        # Reentrante: entrega e gravação no spool mudam o estado do item sob o lock
+        self.lock = threading.RLock()
+        self.stats = {'sent': 0, 'retried': 0, 'spooled': 0, 'from_spool': 0}
+
+    def start(self):
+        """Inicia as threads e reenfileira o que ficou no spool da execução anterior"""
+        for path in spooled_files(self.spool_dir):
+            try:
+                with open(path, 'rb') as f:
+                    message = message_from_bytes(f.read())
+            except Exception as e:
+                print(f"⚠️ Mensagem do spool ilegível ({os.path.basename(path)}): {e}")
+                continue
+            self.queue.put(self._item(message, spool_path=path))
+            self.stats['from_spool'] += 1
+
+        if self.stats['from_spool']:
+            print(f"📬 Reenviando {self.stats['from_spool']} alertas pendentes do spool")
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"alert-dispatcher-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    @staticmethod
+    def _item(message, spool_path=None, on_handoff=None):
+        # state: 'queued' -> 'sent' ou 'spooled' (trocado apenas sob self.lock)
+        return {'message': message, 'attempts': 0, 'spool_path': spool_path, 'state': 'queued',
+                'on_handoff': on_handoff}
+
+    def submit(self, message, on_handoff=None):
+        """
+        Enfileira uma mensagem (retorna imediatamente)
+
+        `on_handoff` é chamado (na thread de envio ou em drain) uma única vez,
+        quando a mensagem é entregue ou gravada no spool - que é reenviado
+        no início de cada execução.
+        """
+        self.queue.put(self._item(message, on_handoff=on_handoff))
+
+    def _handoff(self, item):
+        callback, item['on_handoff'] = item['on_handoff'], None
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️ Erro ao registrar alerta entregue: {e}")
+
+    def _worker(self):
+        session = self.session_factory()
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    item = self.queue.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+
+                with self.lock:
+                    self.in_flight[threading.current_thread()] = item
+                try:
+                    self._deliver(session, item)
+                finally:
+                    with self.lock:
+                        self.in_flight.pop(threading.current_thread(), None)
+                    self.queue.task_done()
+        finally:
+            session.close()
+
+    def _deliver(self, session, item):
+        """Envia com tentativas e backoff exponencial; esgotadas, grava no spool"""
+        while True:
+            try:
+                session.send(item['message'])
+                self._mark_sent(item)
+                return
+            except Exception as e:
+                item['attempts'] += 1
+                if item['attempts'] > self.retries or self.stop_event.is_set():
+                    print(f"❌ Alerta para {item['message']['To']} não entregue: {e}")
+                    self._spool(item)
+                    return
+
+                delay = self.backoff * 2 ** (item['attempts'] - 1)
+                with self.lock:
+                    self.stats['retried'] += 1
+                print(f"⚠️ Falha no envio ({e}) - nova tentativa em {delay:.0f}s")
+                if self.stop_event.wait(delay):
+                    self._spool(item)
+                    return
+
+    def _mark_sent(self, item):
+        """
+        Registra a entrega; se drain() gravou o item no spool durante o envio,
+        a cópia é removida no mesmo passo (sob o lock: nunca entregue e no spool)
+        """
+        with self.lock:
+            item['state'] = 'sent'
+            self.stats['sent'] += 1
+            # Reenvio do spool ou cópia gravada no prazo final
+            if item['spool_path'] and os.path.exists(item['spool_path']):
+                os.remove(item['spool_path'])
+        self._handoff(item)
+
+    def _spool(self, item):
+        """Grava a mensagem no spool (uma vez por item, nunca se já entregue)"""
+        with self.lock:
+            if item['state'] != 'queued':
+                return
+            if item['spool_path'] and os.path.exists(item['spool_path']):
+                # Veio do spool: o arquivo continua lá para a próxima execução
+                item['state'] = 'spooled'
+                return
+
+            os.makedirs(self.spool_dir, exist_ok=True)
+            path = os.path.join(self.spool_dir, f"{time.time_ns()}-{uuid.uuid4().hex[:8]}.eml")
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(item['message'].as_bytes())
+                os.replace(tmp_path, path)
+            except Exception as e:
+                print(f"❌ Erro ao gravar alerta no spool: {e}")
+                return
+
+            item['spool_path'] = path
+            item['state'] = 'spooled'
+            self.stats['spooled'] += 1
+        self._handoff(item)
+
+    def drain(self, timeout=None):
+        """
+        Aguarda a fila esvaziar, no máximo `timeout` segundos
+
+        O que não foi entregue no prazo (na fila ou ainda em envio) vai para
+        o spool; se um envio em andamento terminar depois, a cópia é removida
+        sob o mesmo lock, então cada alerta é entregue ou fica no spool.
+
+        Returns:
+            bool: True se tudo foi entregue ou gravado no spool a tempo
+        """
+        timeout = timeout if timeout is not None else ALERT_CONFIG.get('drain_timeout', 60)
+        deadline = time.monotonic() + timeout
+
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        drained = not self.queue.unfinished_tasks
+        self.stop_event.set()
+
+        if not drained:
+            pending = []
+            while True:
+                try:
+                    pending.append(self.queue.get_nowait())
+                    self.queue.task_done()
+                except queue.Empty:
+                    break
+            with self.lock:
+                pending.extend(self.in_flight.values())
+            for item in pending:
+                self._spool(item)
+            print(f"⏰ Prazo de {timeout:.0f}s esgotado - {len(pending)} alertas gravados no spool")
+
+        for thread in self.threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()) + 0.5)
+
+        stats = self.stats
+        if stats['sent'] or stats['spooled']:
+            print(f"📧 Alertas: {stats['sent']} enviados | {stats['retried']} novas tentativas | "
+                  f"{stats['spooled']} no spool")
+        return drained
+
+
+def spooled_files(spool_dir=None):
+    """Mensagens no spool aguardando reenvio, em ordem de gravação"""
+    spool_dir = spool_dir or ALERT_CONFIG.get('spool_dir', 'reports/alert_spool')
+    try:
+        names = sorted(name for name in os.listdir(spool_dir) if name.endswith('.eml'))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(spool_dir, name) for name in names]
+
+
+# Despachante compartilhado pela execução atual
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Despachante da execução (iniciado no primeiro uso, esvaziado ao sair)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = AlertDispatcher().start()
+            atexit.register(wait_for_alerts)
+        return _dispatcher
+
+
+def wait_for_alerts(timeout=None):
+    """Aguarda os alertas pendentes (chamado no fim do pipeline e na saída)"""
+    global _dispatcher
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is None:
+        return True
+    return dispatcher.drain(timeout)
+
+
+def flush_spool():
+    """
+    Reenvia o spool de execuções anteriores mesmo sem alertas novos
+
+    Chamado no início do pipeline: inicia o despachante só se houver
+    mensagens pendentes (wait_for_alerts aguarda o reenvio no final).
+    """
+    if spooled_files():
+        get_dispatcher()
@@ -0,0 +1,89 @@
+"""
+Formatação dos Alertas
+Monta as linhas do console, o corpo do email e o anexo CSV com operações
+vetorizadas do pandas (sem iterar linha a linha), limitando o corpo às
+N mais severas e compactando anexos grandes
+"""
+
+import os
+import gzip
+
+import pandas as pd
+from email import encoders
+from email.mime.base import MIMEBase
+
+try:
+    from .email_config import ALERT_CONFIG
+except ImportError:
+    try:
+        # Fallback para importação absoluta
+        import sys
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from email_config import ALERT_CONFIG
+    except ImportError:
+        ALERT_CONFIG = {}
+
+
+def _text(series):
+    # astype(object) antes: em colunas category, astype(str) mantém o NaN
+    return series.astype(object).fillna('N/A').astype(str)
+
+
+def alert_lines(critical_df):
+    """
+    Linha "nome | host | Severidade: x.x" de cada vulnerabilidade
+
+    Returns:
+        Series: Uma string por linha, montada por concatenação de colunas
+    """
+    # round(1) + astype(str) equivale a :.1f sem formatar valor a valor
+    severity = pd.to_numeric(critical_df['severity'], errors='coerce').astype(float).round(1)
+    return ('• ' + _text(critical_df['name']) + ' | ' + _text(critical_df['host'])
+            + ' | Severidade: ' + severity.astype(str))
+
+
+def console_text(critical_df):
+    """Lista do console em uma única string (um print em vez de um por linha)"""
+    return '\n'.join(alert_lines(critical_df).tolist())
+
+
+def email_body(critical_df, top_n=None):
+    """
+    Corpo do email com as `top_n` vulnerabilidades mais severas
+
+    O restante fica apenas no anexo CSV.
+    """
+    top_n = top_n if top_n is not None else ALERT_CONFIG.get('body_top_n', 50)
+    total = len(critical_df)
+
+    if top_n and total > top_n:
+        severity = pd.to_numeric(critical_df['severity'], errors='coerce').reset_index(drop=True)
+        top = critical_df.iloc[severity.nlargest(top_n).index]
+    else:
+        top = critical_df.sort_values('severity', ascending=False, kind='stable')
+
+    body = '\n'.join(alert_lines(top).tolist())
+    if len(top) < total:
+        body += f"\n... e mais {total - len(top)} (lista completa no anexo)"
+    return body
+
+
+def csv_attachment(critical_df, gzip_kb=None):
+    """
+    Anexo CSV; acima de `gzip_kb` KB vai compactado (.csv.gz)
+    """
+    gzip_kb = gzip_kb if gzip_kb is not None else ALERT_CONFIG.get('attachment_gzip_kb', 256)
+    data = critical_df.to_csv(index=False).encode('utf-8')
+
+    if gzip_kb and len(data) > gzip_kb * 1024:
+        data = gzip.compress(data, compresslevel=6)
+        attachment = MIMEBase('application', 'gzip')
+        filename = 'vulnerabilidades.csv.gz'
+    else:
+        attachment = MIMEBase('text', 'csv')
+        filename = 'vulnerabilidades.csv'
+
+    attachment.set_payload(data)
+    encoders.encode_base64(attachment)
+    attachment.add_header('Content-Disposition', f'attachment; filename={filename}')
+    return attachment
@@ -0,0 +1,180 @@
+"""
+Roteamento de Alertas por Responsável
+Mapeia hosts/redes (CIDR) para destinatários com uma árvore de prefixos
+(prefixo mais específico vence) e separa as vulnerabilidades críticas em
+um resumo por destinatário
+
+Formato do arquivo de rotas (ALERT_ROUTES_FILE), uma regra por linha:
+    10.0.0.0/8,infra@empresa.com
+    10.20.0.0/16,redes@empresa.com;noc@empresa.com
+    db01.empresa.com,dba@empresa.com
+    # comentários e linhas vazias são ignorados
+"""
+
+import os
+import ipaddress
+
+try:
+    from .email_config import EMAIL_CONFIG, ALERT_CONFIG
+except ImportError:
+    try:
+        # Fallback para importação absoluta
+        import sys
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from email_config import EMAIL_CONFIG, ALERT_CONFIG
+    except ImportError:
+        EMAIL_CONFIG = {}
+        ALERT_CONFIG = {}
+
+
+class PrefixTrie:
+    """
+    Árvore binária de prefixos IPv4/IPv6 com busca pelo prefixo mais longo
+
+    A busca percorre no máximo 32 (IPv4) ou 128 (IPv6) níveis,
+    independente da quantidade de regras.
+    """
+
+    def __init__(self):
+        # Nó: [filho bit 0, filho bit 1, valor]
+        self.roots = {4: [None, None, None], 6: [None, None, None]}
+        self.size = 0
+
+    def insert(self, network, value):
+        network = ipaddress.ip_network(network, strict=False)
+        bits = int(network.network_address)
+        width = network.max_prefixlen
+
+        node = self.roots[network.version]
+        for i in range(network.prefixlen):
+            bit = (bits >> (width - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+
+        if node[2] is None:
+            self.size += 1
+        node[2] = value
+
+    def lookup(self, address):
+        """Valor do prefixo mais específico que contém o endereço, ou None"""
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return None
+        bits = int(address)
+        width = address.max_prefixlen
+
+        node = self.roots[address.version]
+        best = node[2]
+        for i in range(width):
+            node = node[(bits >> (width - 1 - i)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                best = node[2]
+        return best
+
+
+class AlertRouter:
+    """
+    Regras host/CIDR -> destinatários; hosts sem regra vão para o padrão
+    """
+
+    def __init__(self, default=None):
+        self.default = default
+        self.networks = PrefixTrie()
+        self.hostnames = {}
+
+    def add(self, pattern, recipients):
+        """Adiciona uma regra (CIDR, IP ou nome de host)"""
+        if isinstance(recipients, str):
+            recipients = recipients.replace(';', ',').split(',')
+        recipients = ', '.join(r.strip() for r in recipients if r.strip())
+        if not recipients:
+            raise ValueError(f"regra sem destinatário: {pattern}")
+
+        pattern = pattern.strip()
+        try:
+            self.networks.insert(pattern, recipients)
+        except ValueError:
+            self.hostnames[pattern.lower()] = recipients
+
+    @classmethod
+    def from_file(cls, path, default=None):
+        router = cls(default)
+        with open(path, 'r', encoding='utf-8') as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                pattern, _, recipients = line.partition(',')
+                try:
+                    router.add(pattern, recipients)
+                except ValueError as e:
+                    print(f"⚠️ Regra inválida em {path}:{number} ({e}) - ignorada")
+        return router
+
+    def __len__(self):
+        return self.networks.size + len(self.hostnames)
+
+    def recipient_for(self, host):
+        host = str(host).strip()
+        recipients = self.hostnames.get(host.lower())
+        if recipients is None:
+            recipients = self.networks.lookup(host)
+        return recipients if recipients is not None else self.default
+
+    def route(self, df):
+        """Destinatários de cada linha (cada host distinto é consultado uma vez)"""
+        hosts = df['host'].astype(str)
+        mapping = {host: self.recipient_for(host) for host in hosts.unique()}
+        return hosts.map(mapping)
+
+    def split(self, df):
+        """
+        Separa as vulnerabilidades por destinatário
+
+        Returns:
+            list: Tuplas (destinatários, DataFrame) - um resumo por destinatário
+        """
+        recipients = self.route(df)
+        unrouted = int(recipients.isna().sum())
+        if unrouted:
+            print(f"⚠️ {unrouted} vulnerabilidades sem destinatário (sem regra e sem EMAIL_DESTINATION)")
+        return [(recipient, group) for recipient, group in df.groupby(recipients, sort=False)]
+
+
+# Rotas carregadas (recarregadas se o arquivo mudar)
+_router = None
+_router_source = None
+
+
+def get_router(path=None):
+    """Roteador configurado em ALERT_ROUTES_FILE, ou None se não houver"""
+    global _router, _router_source
+    path = path if path is not None else ALERT_CONFIG.get('routes_file', '')
+    if not path:
+        return None
+
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        print(f"⚠️ Arquivo de rotas {path} não encontrado - enviando tudo para EMAIL_DESTINATION")
+        return None
+
+    if _router is None or _router_source != (path, mtime):
+        _router = AlertRouter.from_file(path, default=EMAIL_CONFIG.get('destination') or None)
+        _router_source = (path, mtime)
+    return _router
+
+
+def split_by_recipient(critical_df, router=None):
+    """
+    Resumos por destinatário; sem rotas configuradas, um único para EMAIL_DESTINATION
+    """
+    if router is None:
+        router = get_router()
+    if router is None:
+        return [(EMAIL_CONFIG.get('destination'), critical_df)]
+    return router.split(critical_df)
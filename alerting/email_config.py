@@ -38,7 +38,24 @@ EMAIL_CONFIG = {
     'smtp_port': int(os.getenv('SMTP_PORT', '587')),
     'email': os.getenv('EMAIL_ADDRESS', ''),
     'password': os.getenv('EMAIL_PASSWORD', ''),  # 🔒 Senha de APP
-    'destination': os.getenv('EMAIL_DESTINATION', os.getenv('EMAIL_ADDRESS', ''))
+    'destination': os.getenv('EMAIL_DESTINATION', os.getenv('EMAIL_ADDRESS', '')),
+    'smtp_timeout': float(os.getenv('SMTP_TIMEOUT', '30'))  # segundos por operação SMTP
+}
+
+# Envio de alertas em segundo plano
+ALERT_CONFIG = {
+    'background': os.getenv('ALERT_BACKGROUND', 'true').lower() == 'true',  # fila + threads de envio
+    'workers': int(os.getenv('ALERT_WORKERS', '1')),
+    'max_retries': int(os.getenv('ALERT_MAX_RETRIES', '3')),
+    'retry_backoff': float(os.getenv('ALERT_RETRY_BACKOFF', '2')),  # segundos (dobra a cada tentativa)
+    'spool_dir': os.getenv('ALERT_SPOOL_DIR', 'reports/alert_spool'),  # não entregues, reenviados depois
+    'drain_timeout': float(os.getenv('ALERT_DRAIN_TIMEOUT', '60')),  # espera máxima no fim do pipeline
+    'routes_file': os.getenv('ALERT_ROUTES_FILE', ''),  # host/CIDR -> destinatários (vazio = só EMAIL_DESTINATION)
+    'suppression': os.getenv('ALERT_SUPPRESSION', 'true').lower() == 'true',  # não repetir alertas
+    'suppression_db': os.getenv('ALERT_SUPPRESSION_DB', 'reports/alert_suppression.db'),
+    'suppression_ttl_hours': float(os.getenv('ALERT_SUPPRESSION_TTL_HOURS', '168')),  # realerta após 7 dias
+    'body_top_n': int(os.getenv('ALERT_BODY_TOP_N', '50')),  # mais severas no corpo (0 = todas)
+    'attachment_gzip_kb': int(os.getenv('ALERT_ATTACHMENT_GZIP_KB', '256'))  # CSV maior vai como .csv.gz
 }
 
 # Configuração do OpenVAS usando variáveis de ambiente
@@ -47,12 +64,38 @@ OPENVAS_CONFIG = {
     'port': int(os.getenv('OPENVAS_PORT', '9390')),
     'username': os.getenv('OPENVAS_USERNAME', 'admin'),
     'password': os.getenv('OPENVAS_PASSWORD', ''),
+    'socket_path': os.getenv('OPENVAS_SOCKET_PATH', ''),  # gvmd local: socket Unix em vez de TLS
+    'cafile': os.getenv('OPENVAS_CAFILE', ''),  # CA para validar o certificado TLS do gvmd (opcional)
     'target_hosts': os.getenv('TARGET_HOSTS', '192.168.1.0/24'),
     'scan_config_id': os.getenv('SCAN_CONFIG_ID', 'daba56c8-73ec-11df-a475-002264764cea'),
     'scanner_id': os.getenv('SCANNER_ID', '08b69003-5fc2-4037-a479-93b440211c73'),
+    'max_concurrent_tasks': int(os.getenv('MAX_CONCURRENT_TASKS', '4')),  # tasks rodando ao mesmo tempo
+    'target_chunk_prefix': int(os.getenv('TARGET_CHUNK_PREFIX', '24')),   # divide CIDRs maiores em /24
+    'task_cache_file': os.getenv('TASK_CACHE_FILE', 'reports/task_cache.json'),  # targets/tasks reutilizados
+    'poll_min_interval': int(os.getenv('POLL_MIN_INTERVAL', '5')),     # segundos entre consultas de status
+    'poll_max_interval': int(os.getenv('POLL_MAX_INTERVAL', '120')),
+    'max_wait': int(os.getenv('OPENVAS_MAX_WAIT', '1800')),  # segundos por task antes de desistir (e parar)
+    'report_min_severity': float(os.getenv('REPORT_MIN_SEVERITY', '0.1')),  # filtro no servidor (ignora logs 0.0)
+    'report_min_qod': int(os.getenv('REPORT_MIN_QOD', '70')),
+    'report_page_size': int(os.getenv('REPORT_PAGE_SIZE', '1000')),       # 0 = relatório inteiro de uma vez
+    'report_fetch_workers': int(os.getenv('REPORT_FETCH_WORKERS', '2')),  # páginas baixadas em paralelo
     'mode': os.getenv('MODE', 'development')  # development ou production
 }
 
+# Configuração de relatórios e histórico de achados
+REPORT_CONFIG = {
+    'output': os.getenv('REPORT_OUTPUT', 'reports/report'),  # caminho sem extensão
+    'formats': [f.strip() for f in os.getenv('REPORT_FORMATS', 'csv').split(',') if f.strip()],  # csv, parquet, feather
+    'compression': os.getenv('REPORT_COMPRESSION', 'zstd'),  # Parquet: zstd/snappy/gzip | Feather: zstd/lz4
+    'stream_chunk_size': int(os.getenv('REPORT_STREAM_CHUNK_SIZE', '10000')),  # main.py --stream
+    'archive': os.getenv('ARCHIVE_REPORTS', 'true').lower() == 'true',  # histórico por data
+    'archive_dir': os.getenv('REPORT_ARCHIVE_DIR', 'reports/archive'),
+    'cache_dir': os.getenv('REPORT_CACHE_DIR', 'reports/cache'),  # relatórios já processados
+    'cache_max_mb': float(os.getenv('REPORT_CACHE_MAX_MB', '512')),  # limite (remove os menos usados)
+    'findings_store': os.getenv('FINDINGS_STORE_FILE', 'reports/findings_store.csv.gz'),
+    'incremental_alerts': os.getenv('INCREMENTAL_ALERTS', 'true').lower() == 'true'  # alerta só o que mudou
+}
+
 def is_configured():
     """Verifica se o email está configurado"""
     required = ['email', 'password']
@@ -76,23 +119,22 @@ def get_mode():
 
 # Teste da configuração
 def test_email_config():
-    import smtplib
     from email.mime.text import MIMEText
+    try:
+        from .smtp_session import SMTPSession
+    except ImportError:
+        from smtp_session import SMTPSession
     
     try:
-        server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-        server.starttls()
-        server.login(EMAIL_CONFIG['email'], EMAIL_CONFIG['password'])
-        
         msg = MIMEText("✅ Configuração funcionando! Sistema pronto.")
         msg['From'] = EMAIL_CONFIG['email']
         msg['To'] = EMAIL_CONFIG['destination']
         msg['Subject'] = "🔧 Teste - Sistema OpenVAS"
         
-        server.sendmail(EMAIL_CONFIG['email'], EMAIL_CONFIG['destination'], msg.as_string())
-        server.quit()
+        with SMTPSession() as session:
+            elapsed = session.send(msg)
         
-        print("✅ Email de teste enviado com sucesso!")
+        print(f"✅ Email de teste enviado com sucesso! ({elapsed * 1000:.0f} ms)")
         return True
         
     except Exception as e:
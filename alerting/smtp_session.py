@@ -0,0 +1,181 @@
+"""
+Sessão SMTP Reutilizável
+Mantém uma conexão autenticada aberta entre os emails de uma execução,
+reconectando automaticamente se o servidor encerrar a sessão
+"""
+
+import ssl
+import time
+import atexit
+import smtplib
+import threading
+
+try:
+    from .email_config import EMAIL_CONFIG
+except ImportError:
+    try:
+        # Fallback para importação absoluta
+        import os
+        import sys
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from email_config import EMAIL_CONFIG
+    except ImportError:
+        EMAIL_CONFIG = {}
+
+# Erros que indicam sessão perdida (vale reconectar e tentar de novo)
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class SMTPSession:
+    """
+    Conexão SMTP autenticada compartilhada pelos envios de uma execução
+    """
+
+    def __init__(self, config=None, timeout=None):
+        self.config = config or EMAIL_CONFIG
+        self.timeout = timeout or self.config.get('smtp_timeout', 30)
+        self.server = None
+        self.lock = threading.Lock()
+        self.stats = {
+            'connections': 0,  # handshakes TLS + AUTH
+            'reconnects': 0,   # reconexões após queda da sessão
+            'sent': 0,
+            'failed': 0,
+            'send_times': []   # segundos de cada envio bem-sucedido
+        }
+
+    def connect(self):
+        """Abre a conexão, negocia TLS e autentica"""
+        host, port = self.config['smtp_server'], int(self.config['smtp_port'])
+        context = ssl.create_default_context()
+
+        if port == 465:
+            server = smtplib.SMTP_SSL(host, port, timeout=self.timeout, context=context)
+        else:
+            server = smtplib.SMTP(host, port, timeout=self.timeout)
+
+        # Falha no STARTTLS ou no login: não deixar o socket aberto
+        try:
+            if port != 465:
+                server.starttls(context=context)
+            server.login(self.config['email'], self.config['password'])
+        except Exception:
+            server.close()
+            raise
+
+        self.server = server
+        self.stats['connections'] += 1
+        return server
+
+    def close(self):
+        """Encerra a sessão (QUIT)"""
+        with self.lock:
+            if self.server is None:
+                return
+            try:
+                self.server.quit()
+            except Exception:
+                self.server.close()
+            self.server = None
+
+    def send(self, message, to_addrs=None):
+        """
+        Envia uma mensagem pela sessão aberta (abre na primeira vez)
+
+        Args:
+            message: Mensagem MIME (From/To já preenchidos)
+            to_addrs: Destinatários (padrão: cabeçalho To da mensagem)
+
+        Returns:
+            float: Segundos gastos no envio
+        """
+        from_addr = message['From'] or self.config['email']
+        to_addrs = to_addrs or [addr.strip() for addr in str(message['To']).split(',') if addr.strip()]
+        payload = message.as_string()
+
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                try:
+                    if self.server is None:
+                        self.connect()
+                    self.server.sendmail(from_addr, to_addrs, payload)
+                except RECONNECT_ERRORS:
+                    # Servidor encerrou a sessão ociosa: reconectar uma vez
+                    self.server = None
+                    self.stats['reconnects'] += 1
+                    self.connect()
+                    self.server.sendmail(from_addr, to_addrs, payload)
+            except Exception:
+                self.stats['failed'] += 1
+                raise
+
+            elapsed = time.perf_counter() - start
+            self.stats['sent'] += 1
+            self.stats['send_times'].append(elapsed)
+            return elapsed
+
+    def send_batch(self, messages):
+        """
+        Envia várias mensagens pela mesma sessão
+
+        Returns:
+            list: Tuplas (mensagem, segundos ou None, erro ou None)
+        """
+        results = []
+        for message in messages:
+            try:
+                results.append((message, self.send(message), None))
+            except Exception as e:
+                print(f"❌ Falha ao enviar para {message['To']}: {e}")
+                results.append((message, None, e))
+        return results
+
+    def get_stats(self):
+        """Contadores da sessão e tempo médio/máximo de envio"""
+        times = self.stats['send_times']
+        return {
+            'connections': self.stats['connections'],
+            'reconnects': self.stats['reconnects'],
+            'sent': self.stats['sent'],
+            'failed': self.stats['failed'],
+            'avg_send': sum(times) / len(times) if times else 0.0,
+            'max_send': max(times) if times else 0.0
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Sessão compartilhada pela execução atual (fechada ao sair)
+_shared_session = None
+_shared_lock = threading.Lock()
+
+
+def get_session():
+    """Sessão SMTP compartilhada entre todos os envios desta execução"""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = SMTPSession()
+            atexit.register(close_session)
+        return _shared_session
+
+
+def close_session():
+    """Fecha a sessão compartilhada e mostra as métricas de envio"""
+    global _shared_session
+    with _shared_lock:
+        session, _shared_session = _shared_session, None
+    if session is None:
+        return
+
+    session.close()
+    stats = session.get_stats()
+    if stats['sent'] or stats['failed']:
+        print(f"📧 Sessão SMTP encerrada (conexões: {stats['connections']} | "
+              f"reconexões: {stats['reconnects']} | enviados: {stats['sent']} | "
+              f"falhas: {stats['failed']} | envio médio: {stats['avg_send'] * 1000:.0f} ms)")
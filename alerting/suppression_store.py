@@ -0,0 +1,259 @@
+"""
+Supressão de Alertas Repetidos
+Registra em SQLite quando cada achado (host, porta, OID) foi alertado;
+um achado só volta a ser alertado depois do TTL, se a severidade aumentar
+ou se não tiver sido reconhecido manualmente (acknowledge)
+"""
+
+import os
+import time
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    from .email_config import ALERT_CONFIG
+except ImportError:
+    try:
+        # Fallback para importação absoluta
+        import sys
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from email_config import ALERT_CONFIG
+    except ImportError:
+        ALERT_CONFIG = {}
+
+KEY_COLUMNS = ['host', 'port', 'oid']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    host TEXT NOT NULL,
+    port TEXT NOT NULL,
+    oid TEXT NOT NULL,
+    severity REAL,
+    first_alerted REAL,
+    last_alerted REAL,
+    alert_count INTEGER NOT NULL DEFAULT 0,
+    acknowledged INTEGER NOT NULL DEFAULT 0,
+    ack_expires REAL,
+    ack_note TEXT,
+    PRIMARY KEY (host, port, oid)
+) WITHOUT ROWID
+"""
+
+
+def _as_text(series):
+    # astype(object) antes: em colunas category, astype(str) mantém o NaN
+    return series.astype(object).fillna('N/A').astype(str).str.strip().replace('', 'N/A')
+
+
+def alert_keys(df):
+    """(host, porta, OID) normalizados de cada linha, como texto"""
+    return pd.DataFrame({
+        'host': _as_text(df['host']),
+        'port': _as_text(df['port']),
+        'oid': _as_text(df['id'])
+    }, index=df.index)
+
+
+class SuppressionStore:
+    """
+    Histórico de alertas enviados e reconhecimentos manuais
+    """
+
+    def __init__(self, path=None, ttl_hours=None):
+        self.path = path or ALERT_CONFIG.get('suppression_db', 'reports/alert_suppression.db')
+        ttl_hours = ttl_hours if ttl_hours is not None else ALERT_CONFIG.get('suppression_ttl_hours', 168)
+        self.ttl = ttl_hours * 3600
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _lookup(self, keys):
+        """
+        Registros existentes para as chaves do DataFrame (uma única consulta)
+
+        As chaves vão para uma tabela temporária e são cruzadas com o histórico
+        por JOIN, em vez de uma consulta por linha.
+        """
+        unique = keys.drop_duplicates()
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS candidates (host TEXT, port TEXT, oid TEXT)")
+        self.conn.execute("DELETE FROM candidates")
+        self.conn.executemany("INSERT INTO candidates VALUES (?, ?, ?)",
+                              unique.itertuples(index=False, name=None))
+        found = pd.read_sql_query(
+            """SELECT a.host, a.port, a.oid, a.severity AS alerted_severity, a.last_alerted,
+                      a.acknowledged, a.ack_expires
+               FROM candidates c JOIN alerts a
+                 ON a.host = c.host AND a.port = c.port AND a.oid = c.oid""",
+            self.conn
+        )
+        # Encerrar a transação implícita (não prender o banco entre filter e mark_alerted)
+        self.conn.commit()
+        return found
+
+    def filter(self, critical_df, now=None):
+        """
+        Separa o que deve ser alertado do que está suprimido
+
+        Um achado é alertado se nunca foi alertado, se o TTL expirou ou se a
+        severidade aumentou; reconhecidos (ack válido) nunca são alertados.
+
+        Returns:
+            tuple: (DataFrame a alertar, quantidade de linhas suprimidas)
+        """
+        if critical_df.empty:
+            return critical_df, 0
+        now = now if now is not None else time.time()
+
+        keys = alert_keys(critical_df)
+        history = keys.merge(self._lookup(keys), on=KEY_COLUMNS, how='left')
+        history.index = critical_df.index
+        for column in ['alerted_severity', 'last_alerted', 'acknowledged', 'ack_expires']:
+            history[column] = pd.to_numeric(history[column], errors='coerce')
+
+        severity = pd.to_numeric(critical_df['severity'], errors='coerce').astype(float).round(2)
+        acknowledged = (history['acknowledged'] == 1) & (
+            history['ack_expires'].isna() | (history['ack_expires'] > now))
+        recent = history['last_alerted'].fillna(float('-inf')) > now - self.ttl
+        worse = severity > history['alerted_severity'].fillna(float('-inf')).round(2)
+
+        suppressed = acknowledged | (recent & ~worse)
+        return critical_df[~suppressed], int(suppressed.sum())
+
+    def mark_alerted(self, df, now=None):
+        """Registra os achados como alertados agora (upsert em lote)"""
+        if df.empty:
+            return
+        now = now if now is not None else time.time()
+
+        keys = alert_keys(df)
+        keys['severity'] = pd.to_numeric(df['severity'], errors='coerce').astype(float).round(2)
+        rows = keys.groupby(KEY_COLUMNS, sort=False)['severity'].max().reset_index()
+
+        with self.conn:
+            self.conn.executemany(
+                """INSERT INTO alerts (host, port, oid, severity, first_alerted, last_alerted, alert_count)
+                   VALUES (?, ?, ?, ?, ?, ?, 1)
+                   ON CONFLICT (host, port, oid) DO UPDATE SET
+                       severity = excluded.severity,
+                       first_alerted = COALESCE(first_alerted, excluded.first_alerted),
+                       last_alerted = excluded.last_alerted,
+                       alert_count = alert_count + 1""",
+                ((host, port, oid, float(sev) if pd.notna(sev) else None, now, now)
+                 for host, port, oid, sev in rows.itertuples(index=False, name=None))
+            )
+
+    def acknowledge(self, host, port, oid, days=None, note=''):
+        """
+        Reconhece um achado: não será alertado (para sempre ou por `days` dias)
+        """
+        expires = time.time() + days * 86400 if days else None
+        with self.conn:
+            self.conn.execute(
+                """INSERT INTO alerts (host, port, oid, acknowledged, ack_expires, ack_note)
+                   VALUES (?, ?, ?, 1, ?, ?)
+                   ON CONFLICT (host, port, oid) DO UPDATE SET
+                       acknowledged = 1, ack_expires = excluded.ack_expires, ack_note = excluded.ack_note""",
+                (host, port, oid, expires, note)
+            )
+
+    def unacknowledge(self, host, port, oid):
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE alerts SET acknowledged = 0, ack_expires = NULL, ack_note = NULL "
+                "WHERE host = ? AND port = ? AND oid = ?", (host, port, oid)
+            )
+        return cursor.rowcount > 0
+
+    def acknowledged(self):
+        """Reconhecimentos cadastrados"""
+        return pd.read_sql_query(
+            "SELECT host, port, oid, ack_expires, ack_note FROM alerts WHERE acknowledged = 1 "
+            "ORDER BY host, port, oid", self.conn
+        )
+
+    def purge(self, days):
+        """Remove registros não alertados há mais de `days` dias (exceto reconhecidos)"""
+        cutoff = time.time() - days * 86400
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM alerts WHERE acknowledged = 0 AND last_alerted < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+
+def suppress_repeated(critical_df):
+    """
+    Aplica a supressão configurada (ALERT_SUPPRESSION)
+
+    Returns:
+        tuple: (DataFrame a alertar, quantidade suprimida)
+    """
+    if not ALERT_CONFIG.get('suppression', True) or critical_df.empty:
+        return critical_df, 0
+    try:
+        with SuppressionStore() as store:
+            return store.filter(critical_df)
+    except Exception as e:
+        print(f"⚠️ Histórico de alertas indisponível ({e}) - alertando tudo")
+        return critical_df, 0
+
+
+def mark_alerted(critical_df):
+    """
+    Registra achados como alertados (chamado só após a entrega ou a gravação no spool)
+
+    Abre a própria conexão: pode rodar nas threads de envio em segundo plano.
+    """
+    if not ALERT_CONFIG.get('suppression', True) or critical_df.empty:
+        return
+    try:
+        with SuppressionStore() as store:
+            store.mark_alerted(critical_df)
+    except Exception as e:
+        print(f"⚠️ Não foi possível registrar os alertas enviados: {e}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconhecimento e supressão de alertas")
+    parser.add_argument('--ack', nargs=3, metavar=('HOST', 'PORTA', 'OID'), help="Reconhecer um achado")
+    parser.add_argument('--days', type=float, help="Validade do reconhecimento em dias (padrão: permanente)")
+    parser.add_argument('--note', default='', help="Observação do reconhecimento")
+    parser.add_argument('--unack', nargs=3, metavar=('HOST', 'PORTA', 'OID'), help="Remover reconhecimento")
+    parser.add_argument('--purge', type=float, metavar='DIAS', help="Apagar registros não alertados há DIAS dias")
+    args = parser.parse_args()
+
+    with SuppressionStore() as store:
+        if args.ack:
+            store.acknowledge(*args.ack, days=args.days, note=args.note)
+            validity = f"por {args.days:g} dias" if args.days else "permanentemente"
+            print(f"🔕 {' | '.join(args.ack)} reconhecido {validity}")
+        elif args.unack:
+            if store.unacknowledge(*args.unack):
+                print(f"🔔 Reconhecimento removido: {' | '.join(args.unack)}")
+            else:
+                print(f"⚠️ Achado não encontrado: {' | '.join(args.unack)}")
+        elif args.purge is not None:
+            print(f"🧹 {store.purge(args.purge)} registros removidos")
+        else:
+            acks = store.acknowledged()
+            print(f"🔕 {len(acks)} achados reconhecidos")
+            for host, port, oid, expires, note in acks.itertuples(index=False, name=None):
+                until = datetime.fromtimestamp(expires).strftime('%Y-%m-%d') if pd.notna(expires) else "permanente"
+                print(f"• {host} | {port} | {oid} | até: {until} {note or ''}")
@@ -3,24 +3,44 @@ Sistema Principal - Híbrido (Simulado + Real)
 Orquestra: Scan → Análise → Relatório → Alerta
 """
 
-from scanner.openvas_scan import load_scan_results
+from scanner.openvas_scan import load_scan_results, stream_scan_results, iter_file_batches
+from scanner.parallel_parser import parse_reports
+from scanner.report_cache import ReportCache, LATEST_KEY
 from processing.vuln_analysis import analyze_vulns, get_stats
-from alerting.alert_console import send_alert, send_summary_alert
+from processing.findings_store import compare_with_previous, critical_delta
+from processing.report_writer import write_report
+from processing.report_archive import archive_scan
+from processing.stream_report import StreamingReportWriter
+from alerting.alert_console import send_alert, send_summary_alert, resend_pending_alerts
+from alerting.alert_dispatcher import wait_for_alerts
 
 # Importar configurações para mostrar modo
 try:
-    from alerting.email_config import get_mode, is_openvas_configured
+    from alerting.email_config import get_mode, is_openvas_configured, REPORT_CONFIG, ALERT_CONFIG
 except ImportError:
     get_mode = lambda: 'development'
     is_openvas_configured = lambda: False
+    REPORT_CONFIG = {}
+    ALERT_CONFIG = {}
 
 
-def main():
+def main(source=None):
+    """
+    Pipeline completo
+    
+    Args:
+        source: Relatório(s) XML (arquivo ou diretório) a reanalisar no lugar
+            de um scan; lidos em paralelo, sem alterar o histórico de scans
+            e sem enviar alertas
+    """
     
     mode = get_mode()
     print(f"🔒 Sistema de Automação de Vulnerabilidades - Modo {mode.upper()}")
     print("=" * 60)
     
+    # Alertas não entregues na execução anterior (enviados em segundo plano)
+    resend_pending_alerts()
+    
     # Mostrar status da configuração
     if mode == 'production':
         if is_openvas_configured():
@@ -33,40 +53,123 @@ def main():
     print()
     
     # SCANNER - Carregar vulnerabilidades
-    print("1️⃣ Executando scan de vulnerabilidades...")
-    vulns = load_scan_results()
+    if source:
+        print(f"1️⃣ Importando relatórios de {source}...")
+        vulns = parse_reports(source)
+    else:
+        print("1️⃣ Executando scan de vulnerabilidades...")
+        vulns = load_scan_results()
     
     # ANÁLISE - Processar dados  
     print("\n2️⃣ Analisando dados...")
     df, critical = analyze_vulns(vulns)
     
+    # Guardar a análise para python main.py --quick reutilizar sem novo scan
+    # (relatórios importados não são o estado atual da rede)
+    if not df.empty and source is None:
+        ReportCache().put(LATEST_KEY, df)
+    
+    # Delta em relação ao scan anterior (novos, corrigidos, alterados)
+    delta = compare_with_previous(df, update=source is None)
+    
     # RELATÓRIO - Gerar CSV
     print("\n3️⃣ Gerando relatório...")
-    try:
-        df.to_csv("reports/report.csv", index=False)
-        print("✅ Relatório CSV salvo em: reports/report.csv")
-    except Exception as e:
-        print(f"❌ Erro ao salvar relatório: {e}")
+    for path in write_report(df):
+        print(f"✅ Relatório salvo em: {path}")
+    if REPORT_CONFIG.get('archive', True) and source is None:
+        archive_scan(df)
     
     # ALERTAS - Notificar sobre vulnerabilidades críticas
     print("\n4️⃣ Enviando alertas...")
-    send_alert(critical)
+    if source:
+        # Relatórios antigos: não alertar nem marcar no histórico de alertas
+        # (mark_alerted silenciaria achados reais até o TTL expirar)
+        print(f"ℹ️ Importação de relatórios - {len(critical)} vulnerabilidades críticas não alertadas")
+    elif ALERT_CONFIG.get('suppression', True):
+        # Histórico de alertas decide: novas, pioradas ou com TTL expirado
+        send_alert(critical)
+    elif REPORT_CONFIG.get('incremental_alerts', True):
+        # Apenas críticas novas ou que pioraram desde o último scan
+        new_critical = critical_delta(delta)
+        if new_critical.empty and not critical.empty:
+            print(f"ℹ️ {len(critical)} vulnerabilidades críticas já alertadas em scans anteriores - nada novo")
+        else:
+            send_alert(new_critical)
+    else:
+        send_alert(critical)
     
     # RESUMO - Estatísticas gerais
     print("\n5️⃣ Resumo estatístico...")
     stats = get_stats(df)
     send_summary_alert(stats)
     
+    # Alertas em segundo plano: aguardar a fila (o restante vai para o spool)
+    wait_for_alerts()
+    
+    print("\n✅ Pipeline concluído com sucesso!")
+    return True
+
+
+def stream_pipeline(filename=None):
+    """
+    Pipeline em streaming para scans muito grandes: os resultados vão direto
+    para o CSV em blocos, com estatísticas acumuladas no caminho, sem montar
+    o DataFrame completo (sem delta entre scans nem arquivo histórico)
+    
+    Args:
+        filename: Exportação (JSON, JSON Lines, XML ou diretório de XMLs)
+            a analisar no lugar de um scan, sem enviar alertas
+    """
+    print("🌊 PIPELINE EM STREAMING - Relatório CSV em memória constante")
+    print("=" * 60)
+    resend_pending_alerts()
+    
+    writer = StreamingReportWriter()
+    try:
+        if filename:
+            print(f"\n1️⃣ Lendo {filename} e gravando relatório...")
+            for batch in iter_file_batches(filename):
+                writer.write_chunk(batch)
+        else:
+            print("\n1️⃣ Executando scan e gravando relatório...")
+            stream_scan_results(writer.consume)
+    except Exception:
+        writer.abort()
+        raise
+    print(f"✅ Relatório CSV salvo em: {writer.close()}")
+    
+    print("\n2️⃣ Enviando alertas...")
+    if filename:
+        # Exportação importada: como em --import, não alertar nem marcar no histórico
+        print(f"ℹ️ Importação de arquivo - {len(writer.critical_frame())} vulnerabilidades críticas não alertadas")
+    else:
+        send_alert(writer.critical_frame())
+    
+    print("\n3️⃣ Resumo estatístico...")
+    send_summary_alert(writer.stats.to_dict())
+    wait_for_alerts()
+    
     print("\n✅ Pipeline concluído com sucesso!")
     return True
 
 
-def quick_analysis():
+def quick_analysis(refresh=False):
+    """
+    Mostra apenas as vulnerabilidades críticas
+    
+    Reutiliza a última análise de main() (cache local); com refresh=True
+    (--quick --refresh) executa um novo scan.
+    """
 
     print("⚡ ANÁLISE RÁPIDA - Apenas vulnerabilidades críticas")
     print("=" * 50)
     
-    vulns = load_scan_results()
+    cached = None if refresh else ReportCache().get(LATEST_KEY)
+    if cached is not None:
+        print("♻️ Reutilizando a última análise (--quick --refresh para um novo scan)")
+        vulns = cached
+    else:
+        vulns = load_scan_results()
     df, critical = analyze_vulns(vulns)
     
     if not critical.empty:
@@ -88,6 +191,10 @@ if __name__ == "__main__":
     
     # Verificar se foi solicitada análise rápida
     if len(sys.argv) > 1 and sys.argv[1] == "--quick":
-        quick_analysis()
+        quick_analysis(refresh="--refresh" in sys.argv)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--stream":
+        stream_pipeline(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif len(sys.argv) > 2 and sys.argv[1] == "--import":
+        main(sys.argv[2])
     else:
         main()
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Histórico de Achados entre Scans
+Guarda os achados do último scan (host, porta, NVT) e calcula o delta
+do scan atual: novos, corrigidos, com severidade alterada e persistentes
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from processing.vuln_analysis import CRITICAL_THRESHOLD
+
+try:
+    from alerting.email_config import REPORT_CONFIG
+except ImportError:
+    REPORT_CONFIG = {}
+
+# Um achado é identificado por host + porta + OID do NVT
+KEY_COLUMNS = ['host', 'port', 'id']
+STORE_COLUMNS = KEY_COLUMNS + ['name', 'severity', 'first_seen', 'last_seen']
+
+
+def finding_keys(df):
+    """
+    Hash de 64 bits de (host, porta, OID) para cada linha
+
+    Comparar hashes inteiros permite montar o delta em O(n) com isin/map,
+    sem merge entre os DataFrames completos.
+    """
+    keys = df[KEY_COLUMNS].astype(str)
+    keys['port'] = keys['port'].replace({'nan': 'N/A', '': 'N/A'})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _severity_by_key(keys, severity):
+    """Maior severidade de cada chave (achados duplicados contam uma vez)"""
+    return pd.Series(severity.to_numpy(dtype=float), index=keys).groupby(level=0).max().round(2)
+
+
+class FindingsStore:
+    """
+    Achados do último scan persistidos em CSV compactado
+    """
+
+    def __init__(self, path=None):
+        self.path = path or REPORT_CONFIG.get('findings_store', 'reports/findings_store.csv.gz')
+        self.previous = self._load()
+        self.previous_keys = finding_keys(self.previous) if not self.previous.empty else None
+
+    @property
+    def is_first_scan(self):
+        return self.previous.empty
+
+    def _load(self):
+        try:
+            # keep_default_na=False: "N/A" é uma porta válida, não um valor ausente
+            return pd.read_csv(
+                self.path, dtype={column: str for column in KEY_COLUMNS + ['name']},
+                keep_default_na=False, na_values={'severity': ['']}
+            )
+        except FileNotFoundError:
+            return pd.DataFrame(columns=STORE_COLUMNS)
+        except Exception as e:
+            print(f"⚠️ Histórico de achados inválido ({e}) - tratando como primeiro scan")
+            return pd.DataFrame(columns=STORE_COLUMNS)
+
+    def diff(self, df):
+        """
+        Compara o scan atual com o anterior
+
+        Args:
+            df: DataFrame do scan atual (saída de analyze_vulns)
+
+        Returns:
+            dict: DataFrames 'new', 'changed', 'persisting' (linhas do scan atual)
+                  e 'resolved' (linhas do histórico que não apareceram mais)
+        """
+        if df.empty or self.is_first_scan:
+            none = df.iloc[0:0].assign(previous_severity=pd.Series(dtype=float))
+            return {
+                'new': df, 'changed': none, 'persisting': none,
+                'resolved': self.previous[STORE_COLUMNS]
+            }
+
+        keys = finding_keys(df)
+
+        previous_severity = _severity_by_key(self.previous_keys, self.previous['severity'])
+        seen = pd.Index(previous_severity.index)
+        known = seen.isin(keys)
+        in_previous = pd.Index(keys).isin(seen)
+
+        persisting = df[in_previous].copy()
+        persisting['previous_severity'] = pd.Series(keys[in_previous]).map(previous_severity).to_numpy()
+        changed_mask = persisting['severity'].astype(float).round(2) != persisting['previous_severity']
+
+        resolved_keys = seen[~known]
+        resolved = self.previous[pd.Index(self.previous_keys).isin(resolved_keys)]
+
+        return {
+            'new': df[~in_previous],
+            'changed': persisting[changed_mask],
+            'persisting': persisting,
+            'resolved': resolved[STORE_COLUMNS]
+        }
+
+    def save(self, df, now=None):
+        """
+        Substitui o histórico pelos achados do scan atual
+
+        first_seen é preservado para achados que já existiam.
+        """
+        now = now or datetime.now().isoformat(timespec='seconds')
+        if df.empty:
+            state = pd.DataFrame(columns=STORE_COLUMNS)
+        else:
+            state = df[KEY_COLUMNS + ['name', 'severity']].astype({column: str for column in KEY_COLUMNS + ['name']})
+            state = state.assign(_key=finding_keys(df)).sort_values('severity', ascending=False)
+            state = state.drop_duplicates('_key')
+
+            first_seen = pd.Series(dtype=str)
+            if not self.is_first_scan:
+                first_seen = pd.Series(
+                    self.previous['first_seen'].to_numpy(), index=self.previous_keys
+                ).groupby(level=0).first()
+
+            state['first_seen'] = state['_key'].map(first_seen).fillna(now)
+            state['last_seen'] = now
+            state = state.drop(columns='_key')[STORE_COLUMNS]
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Grava de forma atômica (arquivo temporário + rename)
+        tmp_path = f"{self.path}.tmp"
+        compression = 'gzip' if self.path.endswith('.gz') else None
+        state.to_csv(tmp_path, index=False, compression=compression)
+        os.replace(tmp_path, self.path)
+
+
+def compare_with_previous(df, update=True, path=None):
+    """
+    Calcula o delta do scan atual em relação ao anterior e atualiza o histórico
+
+    Args:
+        df: DataFrame do scan atual
+        update: Se False, apenas compara (não grava o scan atual como referência)
+        path: Arquivo do histórico (padrão: REPORT_CONFIG['findings_store'])
+
+    Returns:
+        dict: Delta (ver FindingsStore.diff)
+    """
+    store = FindingsStore(path)
+    delta = store.diff(df)
+
+    if store.is_first_scan:
+        status = "Primeiro scan registrado" if update else "Sem scan anterior para comparar"
+        print(f"🆕 {status}: {len(delta['new'])} achados")
+    else:
+        print(f"🆕 Novos: {len(delta['new'])} | ✅ Corrigidos: {len(delta['resolved'])} | "
+              f"🔄 Severidade alterada: {len(delta['changed'])} | "
+              f"📌 Persistentes: {len(delta['persisting'])}")
+
+    if update:
+        try:
+            store.save(df)
+        except Exception as e:
+            print(f"❌ Erro ao salvar histórico de achados: {e}")
+
+    return delta
+
+
+def critical_delta(delta, threshold=CRITICAL_THRESHOLD):
+    """
+    Vulnerabilidades críticas que merecem alerta: novas ou com severidade aumentada
+
+    Args:
+        delta: Resultado de compare_with_previous
+        threshold: Limite de vulnerabilidade crítica
+
+    Returns:
+        DataFrame: Críticas novas ou que pioraram desde o último scan
+    """
+    alerts = delta['new']
+    changed = delta['changed']
+    if not changed.empty:
+        worsened = changed[changed['severity'].astype(float) > changed['previous_severity']]
+        alerts = pd.concat([alerts, worsened.drop(columns='previous_severity')], ignore_index=True)
+
+    if alerts.empty:
+        return alerts
+    return alerts[alerts['severity'].astype(float) >= threshold]
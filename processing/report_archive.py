@@ -0,0 +1,291 @@
+"""
+Arquivo Histórico de Relatórios
+Guarda cada scan em reports/archive particionado por data (e opcionalmente
+por target) e consulta intervalos de datas para calcular tendências
+"""
+
+import os
+import re
+import sys
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from processing.vuln_analysis import SEVERITY_BANDS
+from processing.findings_store import finding_keys
+from processing.report_writer import REPORT_FORMATS, ARROW_AVAILABLE, read_report
+
+try:
+    from alerting.email_config import REPORT_CONFIG
+except ImportError:
+    REPORT_CONFIG = {}
+
+# Leitura do arquivo como dataset particionado (opcional, junto com o pyarrow)
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = ds = None
+
+# Partições no estilo Hive: archive/scan_date=2024-01-31/target=.../part-*.parquet
+DATE_PARTITION = 'scan_date'
+TARGET_PARTITION = 'target'
+
+
+def _archive_dir(archive_dir=None):
+    return archive_dir or REPORT_CONFIG.get('archive_dir', 'reports/archive')
+
+
+def _archive_format():
+    """Parquet quando o pyarrow está disponível, senão CSV"""
+    return 'parquet' if ARROW_AVAILABLE else 'csv'
+
+
+def _to_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _safe_partition(value):
+    """Nome de target utilizável como diretório (ex.: 10.0.0.0/24 -> 10.0.0.0_24)"""
+    return re.sub(r'[^A-Za-z0-9._-]', '_', str(value))
+
+
+def archive_scan(df, scanned_at=None, target=None, archive_dir=None):
+    """
+    Acrescenta o resultado de um scan ao arquivo histórico
+
+    Cada execução grava um arquivo novo; nada existente é sobrescrito.
+
+    Args:
+        df: DataFrame de vulnerabilidades do scan
+        scanned_at: Data/hora do scan (padrão: agora)
+        target: Target do scan, para particionar também por target (opcional)
+        archive_dir: Diretório do arquivo (padrão: REPORT_CONFIG['archive_dir'])
+
+    Returns:
+        str: Caminho gravado (None em caso de erro)
+    """
+    scanned_at = scanned_at or datetime.now()
+    directory = os.path.join(_archive_dir(archive_dir), f"{DATE_PARTITION}={scanned_at.date().isoformat()}")
+    if target:
+        directory = os.path.join(directory, f"{TARGET_PARTITION}={_safe_partition(target)}")
+
+    name = _archive_format()
+    spec = REPORT_FORMATS[name]
+    filename = f"part-{scanned_at.strftime('%H%M%S%f')}{spec['extension']}"
+    path = os.path.join(directory, filename)
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Oculto ('.') até o os.replace: a descoberta do dataset ignora o parcial
+        tmp_path = os.path.join(directory, f".{filename}.tmp")
+        spec['write'](df.assign(scanned_at=scanned_at.isoformat(timespec='seconds')), tmp_path,
+                      REPORT_CONFIG.get('compression'))
+        os.replace(tmp_path, path)
+        print(f"🗄️ Scan arquivado em: {path}")
+        return path
+    except Exception as e:
+        print(f"❌ Erro ao arquivar scan: {e}")
+        return None
+
+
+def list_partitions(start=None, end=None, target=None, archive_dir=None):
+    """
+    Arquivos do histórico dentro do intervalo de datas
+
+    A seleção é feita pelos nomes dos diretórios (poda de partições):
+    datas fora do intervalo nunca são abertas.
+
+    Returns:
+        list: Tuplas (data, caminho) em ordem cronológica
+    """
+    root = _archive_dir(archive_dir)
+    start, end = _to_date(start), _to_date(end)
+    prefix = f"{DATE_PARTITION}="
+    target_dir = f"{TARGET_PARTITION}={_safe_partition(target)}" if target else None
+    extensions = tuple(spec['extension'] for spec in REPORT_FORMATS.values())
+
+    try:
+        partitions = sorted(entry for entry in os.listdir(root) if entry.startswith(prefix))
+    except FileNotFoundError:
+        return []
+
+    files = []
+    for partition in partitions:
+        try:
+            scan_date = date.fromisoformat(partition[len(prefix):])
+        except ValueError:
+            continue
+        if (start and scan_date < start) or (end and scan_date > end):
+            continue
+
+        # Com target, apenas o subdiretório dele; sem target, o dia inteiro
+        directory = os.path.join(root, partition, target_dir) if target_dir else os.path.join(root, partition)
+        for dirpath, _, filenames in os.walk(directory):
+            files.extend((scan_date, os.path.join(dirpath, name))
+                         for name in sorted(filenames) if name.endswith(extensions))
+
+    return files
+
+
+def load_range(start=None, end=None, columns=None, target=None, archive_dir=None):
+    """
+    Carrega os scans arquivados entre start e end (inclusive)
+
+    Com pyarrow, o arquivo é lido como um dataset Hive: o filtro por
+    scan_date/target poda as partições e só as colunas pedidas saem do disco.
+    Colunas categóricas continuam categóricas.
+
+    Args:
+        start, end: Datas (date ou "AAAA-MM-DD"); None = sem limite
+        columns: Colunas a ler (padrão: todas); em Parquet só elas saem do disco
+        target: Restringe a um target arquivado com archive_scan(target=...)
+        archive_dir: Diretório do arquivo (padrão: REPORT_CONFIG['archive_dir'])
+
+    Returns:
+        DataFrame: Scans concatenados com a coluna scan_date
+    """
+    if _archive_format() == 'parquet' and ds is not None:
+        frame = _load_dataset(start, end, columns, target, archive_dir)
+    else:
+        frames = []
+        for scan_date, path in list_partitions(start, end, target, archive_dir):
+            frame = read_report(path, columns)
+            if not frame.empty:
+                frames.append(frame.assign(**{DATE_PARTITION: pd.Timestamp(scan_date)}))
+        frame = pd.concat(frames, ignore_index=True) if frames else None
+
+    if frame is None or frame.empty:
+        return pd.DataFrame(columns=(columns or []) + [DATE_PARTITION])
+    return frame
+
+
+def _load_dataset(start, end, columns, target, archive_dir):
+    """Leitura do arquivo Parquet via pyarrow.dataset (filtro + projeção)"""
+    root = _archive_dir(archive_dir)
+    if not os.path.isdir(root):
+        return None
+
+    partitioning = ds.partitioning(
+        pa.schema([(DATE_PARTITION, pa.date32()), (TARGET_PARTITION, pa.string())]), flavor='hive')
+    dataset = ds.dataset(root, format='parquet', partitioning=partitioning)
+    # Apenas Parquet (CSVs gravados numa execução sem pyarrow ficam de fora)
+    files = [path for path in dataset.files if path.endswith(REPORT_FORMATS['parquet']['extension'])]
+    if not files:
+        return None
+
+    # O schema vem do primeiro arquivo: índices de dicionário int8 estourariam
+    # em scans com mais categorias, então todos são lidos como int32
+    schema = pa.schema([field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+                        if pa.types.is_dictionary(field.type) else field
+                        for field in dataset.schema], metadata=dataset.schema.metadata)
+    dataset = ds.dataset(files, schema=schema, format='parquet',
+                         partitioning=partitioning, partition_base_dir=root)
+
+    condition = None
+    start, end = _to_date(start), _to_date(end)
+    if start:
+        condition = ds.field(DATE_PARTITION) >= pa.scalar(start)
+    if end:
+        clause = ds.field(DATE_PARTITION) <= pa.scalar(end)
+        condition = clause if condition is None else condition & clause
+    if target:
+        clause = ds.field(TARGET_PARTITION) == _safe_partition(target)
+        condition = clause if condition is None else condition & clause
+
+    # A partição de target só aparece se foi pedida (como na leitura por arquivo)
+    if columns is None:
+        columns = [name for name in schema.names if name not in (DATE_PARTITION, TARGET_PARTITION)]
+    projection = [name for name in columns if name != DATE_PARTITION] + [DATE_PARTITION]
+
+    table = dataset.to_table(columns=projection, filter=condition)
+    frame = table.to_pandas(date_as_object=False)
+    frame[DATE_PARTITION] = frame[DATE_PARTITION].astype('datetime64[ns]')
+    return frame.sort_values(DATE_PARTITION, kind='stable', ignore_index=True)
+
+
+def severity_trend(df, bands=None):
+    """
+    Quantidade de vulnerabilidades por faixa de severidade e por dia
+
+    Args:
+        df: Resultado de load_range (precisa de 'severity' e 'scan_date')
+        bands: Faixas CVSS (padrão: SEVERITY_BANDS)
+
+    Returns:
+        DataFrame: Uma linha por dia, uma coluna por faixa
+    """
+    bands = bands or SEVERITY_BANDS
+    if df.empty:
+        return pd.DataFrame(columns=list(bands))
+
+    edges = np.fromiter(bands.values(), dtype=float)
+    severity = df['severity'].to_numpy(dtype=float)
+    band_index = (np.searchsorted(edges, severity, side='right') - 1).clip(0)
+    labels = pd.Categorical.from_codes(band_index, categories=list(bands))
+
+    trend = df.groupby([df[DATE_PARTITION], labels], observed=False).size().unstack(fill_value=0)
+    trend.columns.name = None
+    return trend
+
+
+def time_to_remediate(df):
+    """
+    Tempo médio até a correção de achados (host, porta, NVT) no intervalo
+
+    Um achado é considerado corrigido no primeiro dia de scan após a sua
+    última aparição.
+
+    Args:
+        df: Resultado de load_range (precisa de host, port, id e scan_date)
+
+    Returns:
+        dict: resolved, open e mean_days (média de dias até a correção)
+    """
+    if df.empty:
+        return {'resolved': 0, 'open': 0, 'mean_days': np.nan}
+
+    seen = pd.DataFrame({'key': finding_keys(df), 'day': df[DATE_PARTITION].to_numpy()})
+    spans = seen.groupby('key')['day'].agg(['min', 'max'])
+
+    scan_days = np.sort(seen['day'].unique())
+    is_open = spans['max'].to_numpy() == scan_days[-1]
+    resolved = spans[~is_open]
+
+    # Próximo dia de scan após a última aparição
+    fixed_on = scan_days[np.searchsorted(scan_days, resolved['max'].to_numpy(), side='right')]
+    days = (fixed_on - resolved['min'].to_numpy()) / np.timedelta64(1, 'D')
+
+    return {
+        'resolved': len(resolved),
+        'open': int(is_open.sum()),
+        'mean_days': float(days.mean()) if len(days) else np.nan
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tendências do arquivo histórico de scans")
+    parser.add_argument('--start', help="Data inicial (AAAA-MM-DD)")
+    parser.add_argument('--end', help="Data final (AAAA-MM-DD)")
+    parser.add_argument('--target', help="Target arquivado (opcional)")
+    args = parser.parse_args()
+
+    history = load_range(args.start, args.end, ['host', 'port', 'id', 'severity'], args.target)
+    print(f"🗄️ {len(history)} achados em {history[DATE_PARTITION].nunique()} dias de scan")
+
+    print("\n📈 Vulnerabilidades por faixa e por dia:")
+    print(severity_trend(history))
+
+    mttr = time_to_remediate(history)
+    print(f"\n⏱️ Corrigidos: {mttr['resolved']} | Em aberto: {mttr['open']} | "
+          f"Tempo médio até correção: {mttr['mean_days']:.1f} dias")
@@ -0,0 +1,161 @@
+"""
+Escrita e Leitura de Relatórios
+Grava o DataFrame de vulnerabilidades em um ou mais formatos (CSV, Parquet,
+Feather) e lê de volta apenas as colunas necessárias
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from alerting.email_config import REPORT_CONFIG
+except ImportError:
+    REPORT_CONFIG = {}
+
+# Parquet e Feather dependem do pyarrow (opcional)
+try:
+    import pyarrow  # noqa: F401
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+
+def _write_csv(df, path, compression):
+    # CSV fica sem compressão para continuar legível em qualquer ferramenta
+    df.to_csv(path, index=False)
+
+
+def _read_csv(path, columns):
+    return pd.read_csv(path, usecols=columns)
+
+
+def _write_parquet(df, path, compression):
+    df.to_parquet(path, index=False, engine='pyarrow', compression=compression or 'zstd')
+
+
+def _read_parquet(path, columns):
+    return pd.read_parquet(path, columns=columns, engine='pyarrow')
+
+
+def _write_feather(df, path, compression):
+    # Feather suporta apenas zstd, lz4 ou sem compressão
+    if compression not in ('zstd', 'lz4', 'uncompressed'):
+        compression = 'zstd'
+    df.reset_index(drop=True).to_feather(path, compression=compression)
+
+
+def _read_feather(path, columns):
+    return pd.read_feather(path, columns=columns)
+
+
+# Formato -> extensão, funções de escrita/leitura e se precisa do pyarrow
+REPORT_FORMATS = {
+    'csv': {'extension': '.csv', 'write': _write_csv, 'read': _read_csv, 'arrow': False},
+    'parquet': {'extension': '.parquet', 'write': _write_parquet, 'read': _read_parquet, 'arrow': True},
+    'feather': {'extension': '.feather', 'write': _write_feather, 'read': _read_feather, 'arrow': True}
+}
+
+
+def register_format(name, extension, write, read, arrow=False):
+    """
+    Adiciona um formato de relatório
+
+    Args:
+        name: Nome usado em REPORT_FORMATS do .env (ex.: "orc")
+        extension: Extensão do arquivo (ex.: ".orc")
+        write: Função (df, path, compression) que grava o arquivo
+        read: Função (path, columns) que retorna um DataFrame
+        arrow: Se o formato depende do pyarrow
+    """
+    REPORT_FORMATS[name] = {'extension': extension, 'write': write, 'read': read, 'arrow': arrow}
+
+
+def _format_for_path(path):
+    for name, spec in REPORT_FORMATS.items():
+        if path.endswith(spec['extension']):
+            return name
+    return None
+
+
+def write_report(df, base_path=None, formats=None, compression=None):
+    """
+    Grava o relatório em cada formato configurado
+
+    Args:
+        df: DataFrame de vulnerabilidades
+        base_path: Caminho sem extensão (padrão: REPORT_CONFIG['output'])
+        formats: Lista de formatos (padrão: REPORT_CONFIG['formats'])
+        compression: Codec de compressão (padrão: REPORT_CONFIG['compression'])
+
+    Returns:
+        list: Caminhos gravados
+    """
+    base_path = base_path or REPORT_CONFIG.get('output', 'reports/report')
+    formats = formats or REPORT_CONFIG.get('formats', ['csv'])
+    compression = compression or REPORT_CONFIG.get('compression')
+
+    directory = os.path.dirname(base_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    written = []
+    for name in formats:
+        spec = REPORT_FORMATS.get(name)
+        if spec is None:
+            print(f"⚠️ Formato de relatório desconhecido: {name}")
+            continue
+        if spec['arrow'] and not ARROW_AVAILABLE:
+            print(f"⚠️ Formato {name} requer pyarrow (pip install pyarrow) - ignorado")
+            continue
+
+        path = f"{base_path}{spec['extension']}"
+        tmp_path = f"{path}.tmp"
+        try:
+            # Grava de forma atômica (arquivo temporário + rename)
+            spec['write'](df, tmp_path, compression)
+            os.replace(tmp_path, path)
+            written.append(path)
+        except Exception as e:
+            print(f"❌ Erro ao salvar relatório {name}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # Sem nenhum formato gravado, garante ao menos o CSV
+    if not written and 'csv' not in formats:
+        print("⚠️ Nenhum formato disponível - salvando em CSV")
+        return write_report(df, base_path, ['csv'], compression)
+
+    return written
+
+
+def read_report(path, columns=None):
+    """
+    Lê um relatório gravado por write_report
+
+    Em Parquet/Feather apenas as colunas pedidas são lidas do disco.
+
+    Args:
+        path: Arquivo do relatório (formato detectado pela extensão)
+        columns: Lista de colunas (padrão: todas)
+
+    Returns:
+        DataFrame: Relatório carregado (vazio em caso de erro)
+    """
+    name = _format_for_path(path)
+    if name is None:
+        print(f"❌ Formato de relatório não reconhecido: {path}")
+        return pd.DataFrame()
+
+    spec = REPORT_FORMATS[name]
+    if spec['arrow'] and not ARROW_AVAILABLE:
+        print(f"❌ Leitura de {name} requer pyarrow (pip install pyarrow)")
+        return pd.DataFrame()
+
+    try:
+        return spec['read'](path, columns)
+    except Exception as e:
+        print(f"❌ Erro ao ler relatório {path}: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,151 @@
+"""
+Relatório em Streaming
+Grava o CSV em blocos à medida que os resultados chegam do scanner e
+acumula as estatísticas no caminho, sem montar o DataFrame completo
+"""
+
+import os
+import sys
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from processing.vuln_analysis import CRITICAL_THRESHOLD, SEVERITY_BANDS, band_counts, build_frame, severity_summary
+
+try:
+    from alerting.email_config import REPORT_CONFIG
+except ImportError:
+    REPORT_CONFIG = {}
+
+# Colunas do relatório, na ordem em que o parser gera os resultados
+REPORT_COLUMNS = ['id', 'name', 'host', 'port', 'severity', 'description']
+
+
+class RunningStats:
+    """
+    Estatísticas de get_stats acumuladas bloco a bloco
+
+    Só o conjunto de hosts cresce com o scan (um item por host, não por achado).
+    """
+
+    def __init__(self, threshold=CRITICAL_THRESHOLD):
+        self.threshold = threshold
+        self.total = 0
+        self.counts = dict.fromkeys(SEVERITY_BANDS, 0)
+        self.severity_sum = 0.0
+        self.severity_max = np.nan
+        self.hosts = set()
+
+    def update(self, chunk):
+        """
+        Acumula um bloco e retorna a máscara de vulnerabilidades críticas dele
+        """
+        summary = severity_summary(chunk, threshold=self.threshold)
+        valid = sum(summary['counts'].values())
+
+        self.total += len(chunk)
+        for band, count in summary['counts'].items():
+            self.counts[band] += count
+        if valid:
+            self.severity_sum += float(summary['mean']) * valid
+            self.severity_max = np.fmax(self.severity_max, summary['max'])
+        self.hosts.update(chunk['host'].dropna().unique())
+
+        return summary['critical_mask']
+
+    def to_dict(self):
+        """Mesmo formato de get_stats"""
+        if not self.total:
+            return {}
+
+        valid = sum(self.counts.values())
+        return {
+            'total': self.total,
+            **band_counts(self.counts),
+            'avg_severity': self.severity_sum / valid if valid else np.nan,
+            'max_severity': self.severity_max,
+            'hosts_affected': len(self.hosts)
+        }
+
+
+class StreamingReportWriter:
+    """
+    Consome vulnerabilidades em blocos: classifica, grava no CSV e acumula
+
+    Uso:
+        writer = StreamingReportWriter()
+        writer.consume(connector.iter_scan_results(task_id))
+        writer.close()
+        send_alert(writer.critical_frame())
+        send_summary_alert(writer.stats.to_dict())
+    """
+
+    def __init__(self, path=None, chunk_size=None, threshold=CRITICAL_THRESHOLD):
+        self.path = path or f"{REPORT_CONFIG.get('output', 'reports/report')}.csv"
+        self.chunk_size = chunk_size or REPORT_CONFIG.get('stream_chunk_size', 10000)
+        self.stats = RunningStats(threshold)
+        self.critical = []
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Grava em arquivo temporário; o relatório anterior só é substituído no close()
+        self._tmp_path = f"{self.path}.tmp"
+        self._file = open(self._tmp_path, 'w', encoding='utf-8', newline='')
+        self._header = True
+
+    def write_chunk(self, vulns):
+        """Processa um bloco (lista de dicionários) de vulnerabilidades"""
+        if not vulns:
+            return
+
+        chunk = build_frame(pd.DataFrame(vulns).reindex(columns=REPORT_COLUMNS))
+        critical_mask = self.stats.update(chunk)
+        if critical_mask.any():
+            self.critical.append(chunk[critical_mask])
+
+        chunk.to_csv(self._file, index=False, header=self._header)
+        self._header = False
+
+    def consume(self, vulns):
+        """
+        Consome um iterável de vulnerabilidades em blocos de chunk_size
+
+        Returns:
+            int: Quantidade de vulnerabilidades consumidas
+        """
+        iterator = iter(vulns)
+        consumed = 0
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return consumed
+            self.write_chunk(chunk)
+            consumed += len(chunk)
+
+    def close(self):
+        """Finaliza o CSV e substitui o relatório anterior"""
+        if self._file.closed:
+            return self.path
+        if self._header:
+            # Nenhum resultado: relatório só com o cabeçalho
+            self._file.write(','.join(REPORT_COLUMNS) + '\n')
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        """Descarta o arquivo parcial (o relatório anterior é mantido)"""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def critical_frame(self):
+        """Vulnerabilidades críticas encontradas (normalmente poucas)"""
+        if not self.critical:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        return pd.concat(self.critical, ignore_index=True)
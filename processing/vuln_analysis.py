@@ -3,11 +3,121 @@ Análise de Vulnerabilidades
 Usa pandas para analisar dados de vulnerabilidades
 """
 
+import numpy as np
 import pandas as pd
 
 # Limite para considerar vulnerabilidade crítica
 CRITICAL_THRESHOLD = 7.0
 
+# Faixas de severidade CVSS: nome -> limite inferior (em ordem crescente)
+SEVERITY_BANDS = {
+    'low': 0.0,
+    'medium': 4.0,
+    'high': 7.0,
+    'critical': 9.0
+}
+
+
+# Colunas de texto repetidas entre achados: armazenadas como categorias
+# (cada valor distinto guardado uma única vez, linhas guardam só o código)
+CATEGORICAL_COLUMNS = ['id', 'name', 'host', 'port', 'description']
+
+
+def build_frame(vulns):
+    """
+    Monta o DataFrame compacto de vulnerabilidades
+    
+    Host, porta, nome, OID e descrição viram categorias e a severidade
+    vira float32, reduzindo bastante a memória em relatórios grandes
+    e acelerando agrupamentos.
+    
+    Args:
+        vulns: Lista de dicionários (ou DataFrame) de vulnerabilidades
+        
+    Returns:
+        DataFrame: Vulnerabilidades com tipos compactos
+    """
+    df = vulns.copy() if isinstance(vulns, pd.DataFrame) else pd.DataFrame(vulns)
+    if df.empty:
+        return df
+    
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    
+    if 'severity' in df.columns:
+        df['severity'] = pd.to_numeric(df['severity'], errors='coerce').astype('float32')
+    
+    return df
+
+
+def frame_records(df):
+    """
+    DataFrame de build_frame -> lista de vulnerabilidades (dicionários)
+
+    A severidade float32 volta a float com a precisão do relatório.
+    """
+    if df.empty:
+        return []
+    return df.assign(severity=df['severity'].astype(float).round(2)).to_dict('records')
+
+
+def severity_summary(df, bands=None, threshold=CRITICAL_THRESHOLD):
+    """
+    Calcula contagens por faixa, média, máximo e máscara de críticas
+    em uma única passada vetorizada sobre a coluna de severidade
+    
+    Args:
+        df: DataFrame com colunas 'severity' e 'host'
+        bands: Faixas CVSS (padrão: SEVERITY_BANDS)
+        threshold: Limite de vulnerabilidade crítica
+        
+    Returns:
+        dict: counts (por faixa), mean, max, hosts_affected, critical_mask
+    """
+    bands = bands or SEVERITY_BANDS
+    edges = np.fromiter(bands.values(), dtype=float)
+    # float32 (build_frame/cache) -> float com a precisão do relatório (9.1, não 9.100000381...)
+    severity = df['severity'].to_numpy(dtype=float).round(2)
+    valid = ~np.isnan(severity)
+    
+    # Índice da faixa de cada linha (abaixo do primeiro limite conta na primeira faixa)
+    band_index = np.searchsorted(edges, severity[valid], side='right') - 1
+    counts = np.bincount(band_index.clip(0), minlength=len(edges))
+    
+    has_values = valid.any()
+    return {
+        'counts': dict(zip(bands, counts.tolist())),
+        'mean': severity[valid].mean() if has_values else np.nan,
+        'max': severity[valid].max() if has_values else np.nan,
+        'hosts_affected': df['host'].nunique(),
+        'critical_mask': severity >= threshold
+    }
+
+
+def band_counts(counts, bands=None, threshold=CRITICAL_THRESHOLD):
+    """
+    Contagens por faixa no formato de get_stats ("<faixa>_count")
+    
+    As chaves saem das faixas configuradas. Faixas a partir do limite
+    crítico incluem as faixas acima (ex.: "high" conta também as "critical").
+    
+    Args:
+        counts: Contagem por faixa (severity_summary()['counts'])
+        bands: Faixas CVSS (padrão: SEVERITY_BANDS)
+        threshold: Limite de vulnerabilidade crítica
+        
+    Returns:
+        dict: {"<faixa>_count": quantidade}
+    """
+    bands = bands or SEVERITY_BANDS
+    names = list(bands)
+    result = {}
+    for index, band in enumerate(names):
+        included = names[index:] if bands[band] >= threshold else [band]
+        result[f"{band}_count"] = sum(counts.get(name, 0) for name in included)
+    return result
+
 
 def analyze_vulns(vulns):
     """
@@ -21,19 +131,23 @@ def analyze_vulns(vulns):
     """
     print("📊 Analisando vulnerabilidades...")
     
-    # Converter para DataFrame
-    df = pd.DataFrame(vulns)
+    # Converter para DataFrame compacto (categorias + float32)
+    df = build_frame(vulns)
+    
+    if df.empty:
+        print("Total de vulnerabilidades: 0")
+        return df, df
+    
+    summary = severity_summary(df)
     
     # Filtrar vulnerabilidades críticas
-    critical = df[df["severity"] >= CRITICAL_THRESHOLD]
+    critical = df[summary['critical_mask']]
     
     # Estatísticas simples
     print(f"Total de vulnerabilidades: {len(df)}")
     print(f"Vulnerabilidades críticas (>= {CRITICAL_THRESHOLD}): {len(critical)}")
-    
-    if len(df) > 0:
-        print(f"Severidade média: {df['severity'].mean():.1f}")
-        print(f"Severidade máxima: {df['severity'].max():.1f}")
+    print(f"Severidade média: {summary['mean']:.1f}")
+    print(f"Severidade máxima: {summary['max']:.1f}")
     
     return df, critical
 
@@ -45,15 +159,15 @@ def get_stats(df):
     if df.empty:
         return {}
     
+    summary = severity_summary(df)
+    counts = summary['counts']
+    
     stats = {
         'total': len(df),
-        'critical_count': len(df[df["severity"] >= 9.0]),
-        'high_count': len(df[df["severity"] >= 7.0]),
-        'medium_count': len(df[(df["severity"] >= 4.0) & (df["severity"] < 7.0)]),
-        'low_count': len(df[df["severity"] < 4.0]),
-        'avg_severity': df['severity'].mean(),
-        'max_severity': df['severity'].max(),
-        'hosts_affected': df['host'].nunique()
+        **band_counts(counts),
+        'avg_severity': summary['mean'],
+        'max_severity': summary['max'],
+        'hosts_affected': summary['hosts_affected']
     }
     
     return stats
@@ -0,0 +1,83 @@
+"""
+Polling Adaptativo de Tasks
+Usa a taxa de progresso reportada pelo OpenVAS para estimar a conclusão
+e agendar a próxima consulta: curta no início e no fim, longa no meio
+"""
+
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from alerting.email_config import OPENVAS_CONFIG
+except ImportError:
+    OPENVAS_CONFIG = {}
+
+
+class AdaptivePoller:
+    """
+    Calcula o intervalo até a próxima consulta de status de uma task
+    """
+
+    def __init__(self, min_interval=None, max_interval=None, window=5):
+        self.min_interval = min_interval or OPENVAS_CONFIG.get('poll_min_interval', 5)
+        self.max_interval = max_interval or OPENVAS_CONFIG.get('poll_max_interval', 120)
+        self.interval = None
+        self.samples = deque(maxlen=window)  # (timestamp, progresso)
+        self.eta = None
+
+    def update(self, progress, now=None):
+        """
+        Registra o progresso atual e retorna o intervalo até a próxima consulta
+
+        Args:
+            progress: Progresso informado pelo OpenVAS (0-100, "-1" se ainda não iniciou)
+            now: Timestamp da leitura (padrão: agora)
+
+        Returns:
+            float: Segundos até a próxima consulta
+        """
+        now = time.time() if now is None else now
+        progress = _to_float(progress)
+
+        advanced = progress > 0 and (not self.samples or progress > self.samples[-1][1])
+        if advanced:
+            self.samples.append((now, progress))
+
+        rate = self._rate()
+        if advanced and rate:
+            # Consultar na metade do tempo restante estimado
+            self.eta = (100.0 - progress) / rate
+            self.interval = self.eta / 2
+        else:
+            # Sem progresso novo (fila, início ou etapa lenta): backoff exponencial
+            self.interval = self.min_interval if self.interval is None else self.interval * 2
+
+        self.interval = max(self.min_interval, min(self.interval, self.max_interval))
+        return self.interval
+
+    def _rate(self):
+        """Taxa de progresso (% por segundo) na janela de amostras"""
+        if len(self.samples) < 2:
+            return None
+
+        (t0, p0), (t1, p1) = self.samples[0], self.samples[-1]
+        if t1 <= t0:
+            return None
+        return (p1 - p0) / (t1 - t0)
+
+    def format_eta(self):
+        """ETA legível para logs"""
+        if self.eta is None:
+            return "calculando"
+        minutes, seconds = divmod(int(self.eta), 60)
+        return f"{minutes}min {seconds:02d}s"
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,500 @@
+"""
+OpenVAS Connector Assíncrono - GMP sobre asyncio
+Fala GMP direto no socket (TLS ou Unix) do gvmd usando streams do asyncio,
+para que um único processo acompanhe vários scans, baixe relatórios e
+envie alertas ao mesmo tempo em um só event loop
+"""
+
+import os
+import sys
+import ssl
+import asyncio
+import xml.etree.ElementTree as ET
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scanner.openvas_connector import (
+    OPENVAS_CONFIG, ACTIVE_TASK_STATUSES, scan_config_ids, open_task_cache, build_result_filter,
+    name_filter, parse_found_task, parse_found_target, parse_last_report, lookup_cached_report,
+    resolve_task, execute_steps, is_transport_error, retry_wait
+)
+from scanner.scan_orchestrator import STOP_WAIT
+from scanner.report_parser import ResultStreamParser
+from scanner.adaptive_poller import AdaptivePoller
+from scanner.report_cache import ReportCache
+from processing.vuln_analysis import build_frame, frame_records
+
+# Tamanho de leitura do socket
+READ_SIZE = 64 * 1024
+
+
+def _element(tag, attributes=None, children=None):
+    """Monta um comando GMP; `children` é um dict tag -> texto ou atributos"""
+    elem = ET.Element(tag, attributes or {})
+    for child_tag, value in (children or {}).items():
+        child = ET.SubElement(elem, child_tag)
+        if isinstance(value, dict):
+            child.attrib.update(value)
+        else:
+            child.text = value
+    return elem
+
+
+class AsyncOpenVASConnector:
+    """
+    Versão assíncrona do OpenVASConnector
+
+    Uma única sessão GMP autenticada é compartilhada por todas as corrotinas;
+    os comandos são serializados por um lock (GMP é pedido/resposta), mas as
+    esperas entre consultas não bloqueiam o event loop.
+
+    Passos de get_or_create_task, filtros, cache e política de nova tentativa
+    são os mesmos do conector síncrono (funções de openvas_connector); aqui
+    fica apenas a E/S.
+    """
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.connected = False
+        self._lock = None
+        self.session_stats = {
+            'handshakes': 0,
+            'auths': 0,
+            'reconnects': 0,
+            'commands': 0
+        }
+        self.task_cache = None
+        self.report_cache = ReportCache()
+        self.transport = None
+
+    def _ssl_context(self):
+        """Contexto TLS: como o python-gvm, não valida certificado sem CA configurada"""
+        cafile = OPENVAS_CONFIG.get('cafile')
+        if cafile:
+            return ssl.create_default_context(cafile=cafile)
+
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return context
+
+    async def _open(self):
+        """Abre o socket (Unix se disponível, senão TLS) e autentica"""
+        socket_path = OPENVAS_CONFIG.get('socket_path')
+        if socket_path and os.path.exists(socket_path):
+            self.reader, self.writer = await asyncio.open_unix_connection(socket_path, limit=READ_SIZE)
+            self.transport = 'unix'
+        else:
+            self.reader, self.writer = await asyncio.open_connection(
+                OPENVAS_CONFIG['host'],
+                OPENVAS_CONFIG['port'],
+                ssl=self._ssl_context(),
+                limit=READ_SIZE
+            )
+            self.transport = 'tls'
+        self.session_stats['handshakes'] += 1
+
+        credentials = ET.Element('credentials')
+        ET.SubElement(credentials, 'username').text = OPENVAS_CONFIG['username']
+        ET.SubElement(credentials, 'password').text = OPENVAS_CONFIG['password']
+        command = ET.Element('authenticate')
+        command.append(credentials)
+
+        await self._send(command)
+        await self._read_response()
+        self.session_stats['auths'] += 1
+
+    async def connect(self):
+        """Conecta e autentica no OpenVAS/GVM"""
+        self._lock = asyncio.Lock()
+        try:
+            await self._open()
+            self.connected = True
+            print(f"✅ Conexão assíncrona com OpenVAS ({self.transport})")
+            return True
+        except Exception as e:
+            print(f"❌ Erro na conexão: {e}")
+            await self._close_socket()
+            self.connected = False
+            return False
+
+    async def _close_socket(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = None
+        self.writer = None
+
+    async def disconnect(self):
+        """Desconecta do OpenVAS"""
+        await self._close_socket()
+        self.connected = False
+        print(f"🔌 Desconectado do OpenVAS "
+              f"(handshakes: {self.session_stats['handshakes']} | "
+              f"autenticações: {self.session_stats['auths']} | "
+              f"comandos: {self.session_stats['commands']})")
+
+    def get_session_stats(self):
+        return dict(self.session_stats)
+
+    async def _send(self, command):
+        self.writer.write(ET.tostring(command))
+        await self.writer.drain()
+
+    async def _read_chunk(self):
+        data = await self.reader.read(READ_SIZE)
+        if not data:
+            raise ConnectionError("Remote closed the connection")
+        return data
+
+    async def _read_response(self):
+        """Lê uma resposta GMP completa e retorna o elemento raiz"""
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        depth = 0
+        while True:
+            parser.feed(await self._read_chunk())
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth == 0:
+                    status = elem.get('status', '')
+                    if not status.startswith('2'):
+                        raise Exception(f"Erro GMP {status}: {elem.get('status_text', 'Unknown')}")
+                    return elem
+
+    async def _ensure_session(self):
+        """Reabre a sessão se o socket caiu"""
+        if self.writer is None or self.writer.is_closing():
+            self.session_stats['reconnects'] += 1
+            print("🔄 Sessão GMP perdida - reconectando...")
+            await self._close_socket()
+            await self._open()
+
+    async def _with_retry(self, operation, retries=3, error_message="Erro no comando GMP"):
+        """
+        Executa `operation` (corrotina que usa o socket) sob o lock, reconectando
+        e repetindo em falha de transporte (mesma política de _execute_gmp_command)
+        """
+        if not self.connected:
+            raise Exception("Não conectado ao OpenVAS")
+
+        async with self._lock:
+            for attempt in range(retries):
+                had_session = self.writer is not None and not self.writer.is_closing()
+                try:
+                    await self._ensure_session()
+                    self.session_stats['commands'] += 1
+                    return await operation()
+                except Exception as e:
+                    if is_transport_error(e):
+                        await self._close_socket()
+                    wait_time = retry_wait(e, attempt, retries, had_session)
+                    if wait_time is None:
+                        raise Exception(f"{error_message} após {attempt + 1} tentativa(s): {e}") from e
+                    await asyncio.sleep(wait_time)
+
+    async def _execute(self, command, retries=3):
+        """Envia um comando e retorna a resposta, reconectando em queda de conexão"""
+        async def _command():
+            await self._send(command)
+            return await self._read_response()
+
+        return await self._with_retry(_command, retries)
+
+    async def create_target(self, name, hosts):
+        """Cria um target para scan"""
+        try:
+            response = await self._execute(_element('create_target', children={'name': name, 'hosts': hosts}))
+            target_id = response.get('id')
+            print(f"🎯 Target criado: {name} ({target_id})")
+            return target_id
+        except Exception as e:
+            print(f"❌ Erro ao criar target: {e}")
+            return None
+
+    async def create_task(self, target_id, scan_name):
+        """Cria uma task de scan para o target (sem iniciar)"""
+        config_id, scanner_id = scan_config_ids()
+        command = _element('create_task', children={
+            'name': scan_name,
+            'config': {'id': config_id},
+            'target': {'id': target_id},
+            'scanner': {'id': scanner_id}
+        })
+        try:
+            response = await self._execute(command)
+            task_id = response.get('id')
+            print(f"📋 Task criada: {scan_name} ({task_id})")
+            return task_id
+        except Exception as e:
+            print(f"❌ Erro ao criar task: {e}")
+            return None
+
+    async def start_task(self, task_id):
+        """Inicia uma task já existente"""
+        try:
+            await self._execute(_element('start_task', {'task_id': task_id}))
+            print(f"🚀 Scan iniciado: {task_id}")
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao iniciar task: {e}")
+            return False
+
+    async def stop_task(self, task_id):
+        """Para uma task em execução"""
+        try:
+            await self._execute(_element('stop_task', {'task_id': task_id}))
+            print(f"⏹️ Parada solicitada: {task_id}")
+            return True
+        except Exception as e:
+            print(f"❌ Erro ao parar task: {e}")
+            return False
+
+    async def start_scan(self, target_id, scan_name):
+        """Cria e inicia um scan"""
+        task_id = await self.create_task(target_id, scan_name)
+        if not task_id or not await self.start_task(task_id):
+            return None
+        return task_id
+
+    async def get_tasks_status(self, task_ids):
+        """Status de várias tasks em uma única consulta: {task_id: (status, progresso)}"""
+        task_ids = list(task_ids)
+        if not task_ids:
+            return {}
+
+        uuid_filter = " or ".join(f"uuid={task_id}" for task_id in task_ids)
+        command = _element('get_tasks', {
+            'filter': f"{uuid_filter} first=1 rows={len(task_ids)}",
+            'details': '0'
+        })
+
+        statuses = {task_id: ("Unknown", "0") for task_id in task_ids}
+        try:
+            response = await self._execute(command)
+        except Exception as e:
+            print(f"❌ Erro ao verificar status: {e}")
+            return {task_id: ("Error", "0") for task_id in task_ids}
+
+        for task in response.findall('task'):
+            progress_value = task.findtext('progress', '0').strip() or "0"
+            statuses[task.get('id')] = (task.findtext('status', 'Unknown'), progress_value)
+        return statuses
+
+    async def get_task_status(self, task_id):
+        """Verifica o status de uma task"""
+        statuses = await self.get_tasks_status([task_id])
+        return statuses[task_id]
+
+    async def _find_task_by_name(self, name):
+        """Procura no OpenVAS uma task pelo nome exato; retorna (task_id, target_id)"""
+        response = await self._execute(_element('get_tasks', {'filter': name_filter(name), 'details': '0'}))
+        return parse_found_task(response)
+
+    async def _find_target_by_name(self, name):
+        """Procura no OpenVAS um target pelo nome exato; retorna target_id ou None"""
+        response = await self._execute(_element('get_targets', {'filter': name_filter(name)}))
+        return parse_found_target(response)
+
+    async def get_or_create_task(self, hosts):
+        """
+        Reutiliza target/task existentes (mesmos passos e cache do conector síncrono)
+        """
+        if self.task_cache is None:
+            self.task_cache = open_task_cache()
+
+        return await execute_steps(resolve_task(hosts, self.task_cache), {
+            'status': self.get_task_status,
+            'find': self._find_task_by_name,
+            'find_target': self._find_target_by_name,
+            'create_target': self.create_target,
+            'create_task': self.create_task
+        })
+
+    async def wait_for_completion(self, task_id, max_wait=None):
+        """Aguarda o scan completar sem bloquear o event loop"""
+        max_wait = max_wait or OPENVAS_CONFIG.get('max_wait', 1800)
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        poller = AdaptivePoller()
+
+        while loop.time() - start_time < max_wait:
+            status, progress = await self.get_task_status(task_id)
+
+            if status in ["Done", "Stopped"]:
+                print(f"✅ Scan {task_id} concluído: {status}")
+                return True
+
+            interval = poller.update(progress)
+            print(f"📊 {task_id}: {status} | Progresso: {progress}% | ETA: {poller.format_eta()}")
+
+            remaining = max_wait - (loop.time() - start_time)
+            await asyncio.sleep(max(0, min(interval, remaining)))
+
+        print(f"⏰ Timeout aguardando conclusão do scan {task_id}")
+        return False
+
+    async def _get_last_report(self, task_id):
+        response = await self._execute(_element('get_tasks', {'filter': f"uuid={task_id} rows=1"}))
+        return parse_last_report(response)
+
+    async def fetch_report_page(self, report_id, filter_string, summary=None, retries=3):
+        """
+        Baixa uma página do relatório (parser incremental) e retorna a lista
+
+        O socket fica ocupado até o fim da resposta, então a página é lida
+        inteira sob o lock e entregue depois: quem consome os resultados pode
+        chamar outros métodos do conector sem travar. Se o socket cair, a
+        página é pedida de novo (mesma política de nova tentativa dos comandos).
+        """
+        command = _element('get_report', {'report_id': report_id, 'details': '1', 'filter': filter_string})
+
+        async def _read_page():
+            await self._send(command)
+            parser = ResultStreamParser(summary)
+            vulnerabilities = []
+            try:
+                while not parser.finished:
+                    vulnerabilities.extend(parser.feed(await self._read_chunk()))
+                parser.close()
+            finally:
+                # Leitura interrompida deixa lixo no socket: descartar sessão
+                if not parser.finished:
+                    await self._close_socket()
+            return vulnerabilities
+
+        return await self._with_retry(_read_page, retries, "Erro ao baixar relatório")
+
+    async def _iter_report_results(self, report_id):
+        """
+        Resultados do relatório em páginas de REPORT_PAGE_SIZE
+
+        Com REPORT_PAGE_SIZE=0 o relatório vem em uma única página (inteiro em memória).
+        """
+        page_size = OPENVAS_CONFIG.get('report_page_size', 1000)
+        if page_size <= 0:
+            for vuln in await self.fetch_report_page(report_id, build_result_filter(1, -1)):
+                yield vuln
+            return
+
+        # Mesma paginação do modo sequencial de OpenVASConnector.iter_report_pages
+        summary = {}
+        first, count = 1, page_size
+        while count == page_size and (summary.get('filtered') is None or first <= summary['filtered']):
+            page = await self.fetch_report_page(report_id, build_result_filter(first, page_size), summary)
+            count = len(page)
+            for vuln in page:
+                yield vuln
+            first += page_size
+
+    async def iter_scan_results(self, task_id):
+        """
+        Gera as vulnerabilidades do último relatório da task, página a página
+
+        O lock da sessão não fica preso entre os resultados entregues.
+        """
+        report = await self._get_last_report(task_id)
+        if not report:
+            return
+        async for vuln in self._iter_report_results(report[0]):
+            yield vuln
+
+    def _cache_results(self, key, vulnerabilities):
+        """Grava o relatório processado no cache local (DataFrame compacto)"""
+        self.report_cache.put(key, build_frame(vulnerabilities))
+
+    async def get_scan_results(self, task_id):
+        """Obtém os resultados do scan (relatórios concluídos vêm do cache local)"""
+        try:
+            report_id, key, cached = lookup_cached_report(self.report_cache, await self._get_last_report(task_id))
+            if cached is not None:
+                return frame_records(cached)
+            if not report_id:
+                return []
+
+            vulnerabilities = [vuln async for vuln in self._iter_report_results(report_id)]
+            print(f"📋 Processados {len(vulnerabilities)} resultados")
+            if key:
+                self._cache_results(key, vulnerabilities)
+            return vulnerabilities
+        except Exception as e:
+            print(f"❌ Erro ao obter resultados: {e}")
+            return []
+
+    async def _stop_after_timeout(self, task_id):
+        """Para a task e aguarda o gvmd confirmar (a vaga do semáforo segue ocupada)"""
+        await self.stop_task(task_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STOP_WAIT
+        while loop.time() < deadline:
+            status, _ = await self.get_task_status(task_id)
+            if status not in ACTIVE_TASK_STATUSES + ["Stop Requested"]:
+                print(f"⏹️ {task_id}: task parada após timeout ({status})")
+                return
+            await asyncio.sleep(AdaptivePoller().min_interval)
+        print(f"⚠️ {task_id}: gvmd não parou a task em {STOP_WAIT}s - liberando a vaga")
+
+    async def scan_target(self, hosts, semaphore=None, max_wait=None):
+        """Executa o scan de um target; `semaphore` limita tasks simultâneas"""
+        scan = await self.get_or_create_task(hosts)
+        if not scan:
+            return []
+
+        async with semaphore or asyncio.Semaphore(1):
+            if scan['status'] not in ACTIVE_TASK_STATUSES and not await self.start_task(scan['task_id']):
+                return []
+            if not await self.wait_for_completion(scan['task_id'], max_wait):
+                # Parar no gvmd: senão a task segue rodando e outra ocupa a vaga
+                await self._stop_after_timeout(scan['task_id'])
+                return []
+
+        results = await self.get_scan_results(scan['task_id'])
+        print(f"✅ {hosts}: {len(results)} vulnerabilidades")
+        return results
+
+    async def scan_targets(self, targets, max_concurrent=None, max_wait=None):
+        """
+        Executa o scan de vários targets no mesmo event loop
+
+        Returns:
+            list: Vulnerabilidades de todos os targets (mesmo formato de load_scan_results)
+        """
+        max_concurrent = max_concurrent or OPENVAS_CONFIG.get('max_concurrent_tasks', 4)
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        if not await self.connect():
+            return []
+
+        try:
+            batches = await asyncio.gather(
+                *(self.scan_target(hosts, semaphore, max_wait) for hosts in targets),
+                return_exceptions=True
+            )
+        finally:
+            await self.disconnect()
+
+        vulnerabilities = []
+        for hosts, batch in zip(targets, batches):
+            if isinstance(batch, Exception):
+                print(f"❌ {hosts}: {batch}")
+                continue
+            vulnerabilities.extend(batch)
+        return vulnerabilities
+
+
+def run_async_scan(targets=None, max_concurrent=None, max_wait=None):
+    """Wrapper síncrono: executa os scans assíncronos e retorna a lista de vulnerabilidades"""
+    if targets is None:
+        from scanner.scan_orchestrator import split_targets
+        targets = split_targets()
+    return asyncio.run(AsyncOpenVASConnector().scan_targets(targets, max_concurrent, max_wait))
+
+
+if __name__ == "__main__":
+    results = run_async_scan()
+    print(f"✅ {len(results)} vulnerabilidades encontradas")
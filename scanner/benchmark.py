@@ -0,0 +1,280 @@
+"""
+Benchmark do Pipeline de Scan
+Mede tempo, vazão e pico de memória do caminho completo
+(conectar → task → aguardar → relatório → cache → análise) contra o servidor GMP falso
+
+Uso:
+    python scanner/benchmark.py --sizes 1000 100000 1000000 --modes sync async --transports tls unix
+    python scanner/benchmark.py --parse --sizes 1000000 --workers 1 2 4 8 16
+"""
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import argparse
+import multiprocessing
+from queue import Empty
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scanner.fake_gmp_server import FakeGMPServer, synthetic_result_xml
+
+# Modos de execução e transportes disponíveis
+MODES = ['sync', 'async']
+TRANSPORTS = ['tls', 'unix']
+
+
+def _peak_rss_mb():
+    """Pico de memória residente do processo atual (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _timed(function, timings, name):
+    """Acumula em timings[name] o tempo gasto nas chamadas de `function`"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+    return wrapper
+
+
+def _run_case(mode, server_config, overrides, report_overrides, queue):
+    """Executa um caso em processo separado (pico de memória isolado)"""
+    import io
+    import contextlib
+    from scanner.openvas_connector import OPENVAS_CONFIG, OpenVASConnector
+    from scanner.report_cache import REPORT_CONFIG
+    from processing.vuln_analysis import analyze_vulns
+
+    OPENVAS_CONFIG.update(server_config)
+    OPENVAS_CONFIG.update(overrides)
+    REPORT_CONFIG.update(report_overrides)
+    baseline = _peak_rss_mb()
+    timings = {}
+
+    # Logs do pipeline não interessam aqui
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+
+        if mode == 'async':
+            import asyncio
+            from scanner.async_connector import AsyncOpenVASConnector
+            connector = AsyncOpenVASConnector()
+            connector._cache_results = _timed(connector._cache_results, timings, 'cache')
+            vulns = asyncio.run(_async_pipeline(connector, mode, timings))
+        else:
+            connector = OpenVASConnector()
+            # Montagem do DataFrame + gravação no cache medidas à parte do download
+            connector._cache_results = _timed(connector._cache_results, timings, 'cache')
+            connector.connect()
+            scan = connector.get_or_create_task(f"bench-{mode}")
+            connector.start_task(scan['task_id'])
+            connector.wait_for_completion(scan['task_id'])
+            timings['wait'] = time.perf_counter() - start
+
+            report_start = time.perf_counter()
+            vulns = connector.get_scan_results(scan['task_id'])
+            timings['report'] = time.perf_counter() - report_start - timings.get('cache', 0.0)
+            connector.disconnect()
+
+        analysis_start = time.perf_counter()
+        analyze_vulns(vulns)
+        timings['analysis'] = time.perf_counter() - analysis_start
+        timings['total'] = time.perf_counter() - start
+
+    queue.put({
+        'mode': mode,
+        'transport': connector.transport,
+        'results': len(vulns),
+        'timings': timings,
+        'peak_mb': _peak_rss_mb(),
+        'baseline_mb': baseline,
+        'session': connector.get_session_stats()
+    })
+
+
+def _collect(process, queue, timeout=None):
+    """
+    Medição enviada pelo processo do caso
+
+    Não bloqueia para sempre: se o processo morrer sem enviar (exceção,
+    OOM, sinal) ou passar de `timeout` segundos, retorna None.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except Empty:
+            pass
+        if process.exitcode is not None:
+            # A medição pode ter sido enviada logo antes de o processo sair
+            try:
+                return queue.get(timeout=1)
+            except Empty:
+                return None
+        if deadline and time.monotonic() > deadline:
+            process.terminate()
+            return None
+
+
+async def _async_pipeline(connector, mode, timings):
+    """Mesmo fluxo do modo síncrono usando o conector assíncrono"""
+    start = time.perf_counter()
+    await connector.connect()
+    scan = await connector.get_or_create_task(f"bench-{mode}")
+    await connector.start_task(scan['task_id'])
+    await connector.wait_for_completion(scan['task_id'])
+    timings['wait'] = time.perf_counter() - start
+
+    report_start = time.perf_counter()
+    vulns = await connector.get_scan_results(scan['task_id'])
+    timings['report'] = time.perf_counter() - report_start - timings.get('cache', 0.0)
+    await connector.disconnect()
+    return vulns
+
+
+def run_benchmark(sizes, modes, transports=('tls',), scan_duration=0.5, latency=0.0, failure_rate=0.0,
+                  case_timeout=None):
+    """
+    Executa os casos e retorna a lista de medições
+
+    Cada tamanho/transporte usa um servidor falso novo; cada modo roda em um
+    processo próprio para que o pico de memória de um não contamine o outro.
+    Um caso que falha (ou passa de `case_timeout` segundos) é informado e
+    fica fora das medições.
+    """
+    context = multiprocessing.get_context('spawn')
+    measurements = []
+
+    for size, transport in [(size, transport) for size in sizes for transport in transports]:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            socket_path = os.path.join(tmpdir, 'gvmd.sock') if transport == 'unix' else None
+            server = FakeGMPServer(
+                results=size, scan_duration=scan_duration, socket_path=socket_path,
+                latency=latency, failure_rate=failure_rate
+            ).start()
+
+            try:
+                overrides = {
+                    'task_cache_file': os.path.join(tmpdir, 'task_cache.json'),
+                    'poll_min_interval': 0.1,
+                    'poll_max_interval': 0.5,
+                    'report_min_severity': 0.0,  # inclui todos os resultados sintéticos
+                    'report_min_qod': 0
+                }
+                # Cache de relatórios no diretório temporário (não em ./reports/cache)
+                report_overrides = {'cache_dir': os.path.join(tmpdir, 'cache')}
+                for mode in modes:
+                    queue = context.Queue()
+                    process = context.Process(
+                        target=_run_case, args=(mode, server.config(), overrides, report_overrides, queue)
+                    )
+                    process.start()
+                    measurement = _collect(process, queue, case_timeout)
+                    process.join()
+                    if measurement is None:
+                        print(f"❌ {mode:<6} {transport:<5} {size:>9,} resultados | caso falhou "
+                              f"(exitcode {process.exitcode})")
+                        continue
+                    measurement['size'] = size
+                    measurements.append(measurement)
+                    print_measurement(measurement)
+            finally:
+                server.stop()
+
+    if len(transports) > 1:
+        print_transport_comparison(measurements)
+    return measurements
+
+
+def print_measurement(m):
+    total = m['timings']['total']
+    rate = m['results'] / total if total else 0
+    details = ' | '.join(f"{key}: {value:.2f}s" for key, value in m['timings'].items() if key != 'total')
+    print(f"📊 {m['mode']:<6} {m['transport']:<5} {m['size']:>9,} resultados | total {total:7.2f}s | "
+          f"{rate:>10,.0f} res/s | pico {m['peak_mb']:7.1f} MB | {details} | "
+          f"handshakes: {m['session']['handshakes']}")
+
+
+def print_transport_comparison(measurements):
+    """Compara o tempo de download do relatório entre socket Unix e TLS"""
+    print("\n📡 Download do relatório: socket Unix vs TLS")
+    by_case = {}
+    for m in measurements:
+        by_case.setdefault((m['mode'], m['size']), {})[m['transport']] = m['timings']['report']
+
+    for (mode, size), times in sorted(by_case.items()):
+        if 'unix' in times and 'tls' in times and times['unix']:
+            print(f"  {mode:<6} {size:>9,} resultados | TLS {times['tls']:.2f}s | "
+                  f"Unix {times['unix']:.2f}s | {times['tls'] / times['unix']:.2f}x")
+
+
+def write_synthetic_report(path, size):
+    """Grava um relatório XML (formato de exportação do GSA) com resultados sintéticos"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<report id="bench"><report id="bench"><results start="1" max="-1">')
+        for start in range(0, size, 10000):
+            f.write(''.join(synthetic_result_xml(index) for index in range(start, min(start + 10000, size))))
+        f.write(f'</results><result_count>{size}<filtered>{size}</filtered></result_count></report></report>')
+
+
+def run_parse_benchmark(sizes, workers_list, min_range_bytes=None):
+    """
+    Mede a vazão do parsing paralelo (parse_reports) de um relatório grande
+    para cada quantidade de processos
+
+    Returns:
+        list: Medições (size, workers, seconds, results)
+    """
+    from scanner.parallel_parser import MIN_RANGE_BYTES, parse_reports
+
+    measurements = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'report.xml')
+            write_synthetic_report(path, size)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"\n📄 Relatório sintético: {size:,} resultados ({size_mb:.0f} MB)")
+
+            baseline = None
+            for workers in workers_list:
+                start = time.perf_counter()
+                df = parse_reports(path, workers=workers, min_range_bytes=min_range_bytes or MIN_RANGE_BYTES)
+                elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+
+                measurements.append({'size': size, 'workers': workers, 'seconds': elapsed, 'results': len(df)})
+                print(f"  ⚙️ {workers:>3} processos | {elapsed:7.2f}s | {len(df) / elapsed:>10,.0f} res/s | "
+                      f"{baseline / elapsed:5.2f}x")
+
+    return measurements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline contra o servidor GMP falso")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--transports', nargs='+', choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument('--scan-duration', type=float, default=0.5)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--case-timeout', type=float, default=None, help="Limite (segundos) de cada caso")
+    parser.add_argument('--parse', action='store_true', help="Mede apenas o parsing paralelo de relatórios XML")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    if args.parse:
+        print("🏁 Benchmark do parsing paralelo de relatórios")
+        print("=" * 60)
+        run_parse_benchmark(args.sizes, sorted(set(args.workers)))
+        sys.exit(0)
+
+    print("🏁 Benchmark do pipeline de scan (servidor GMP falso)")
+    print("=" * 60)
+    run_benchmark(args.sizes, args.modes, args.transports,
+                  args.scan_duration, args.latency, args.failure_rate, args.case_timeout)
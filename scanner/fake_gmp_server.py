@@ -0,0 +1,480 @@
+"""
+Servidor GMP Falso - Testes e Benchmarks sem Greenbone
+Implementa o suficiente do protocolo GMP (authenticate, get_version,
+create_target, get_targets, create_task, delete_task, start_task, stop_task,
+get_tasks e get_report) para
+exercitar os conectores localmente, com resultados sintéticos,
+latência e quedas de conexão configuráveis
+"""
+
+import os
+import re
+import ssl
+import time
+import uuid
+import random
+import socketserver
+import subprocess
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+# Versão GMP anunciada (suportada pelo python-gvm)
+GMP_VERSION = "22.4"
+
+# Resultados sintéticos: quantidade de NVTs distintas e portas usadas
+SYNTHETIC_NVTS = 5000
+SYNTHETIC_PORTS = ["22/tcp", "80/tcp", "443/tcp", "3306/tcp", "8080/tcp", "general/tcp"]
+
+# Severidade do resultado i = ((i * 37) % 101) / 10 -> padrão se repete a cada 101
+_SEVERITY_PERIOD = 101
+
+# Resultados enviados por escrita no socket
+_WRITE_BATCH = 500
+
+
+def synthetic_severity(index):
+    return ((index * 37) % _SEVERITY_PERIOD) / 10
+
+
+def synthetic_result_xml(index):
+    """XML de um <result> sintético, no formato de um relatório do gvmd"""
+    nvt = index % SYNTHETIC_NVTS
+    host = f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}"
+    return (
+        f'<result id="{uuid.UUID(int=index)}">'
+        f'<name>Synthetic vulnerability {nvt}</name>'
+        f'<host>{host}<asset asset_id="{uuid.UUID(int=index >> 8)}"/><hostname/></host>'
+        f'<port>{SYNTHETIC_PORTS[index % len(SYNTHETIC_PORTS)]}</port>'
+        f'<nvt oid="1.3.6.1.4.1.25623.1.0.{100000 + nvt}"><type>nvt</type>'
+        f'<name>Synthetic vulnerability {nvt}</name></nvt>'
+        f'<severity>{synthetic_severity(index):.1f}</severity>'
+        f'<qod><value>80</value></qod>'
+        f'<description>Synthetic finding {nvt} reported by the fake GMP server.</description>'
+        f'</result>'
+    )
+
+
+def generate_self_signed_cert(directory):
+    """Gera certificado autoassinado com o openssl (apenas para o modo TLS)"""
+    certfile = os.path.join(directory, 'fake_gmp.pem')
+    keyfile = os.path.join(directory, 'fake_gmp.key')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', keyfile, '-out', certfile],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return certfile, keyfile
+
+
+class _Filter:
+    """Interpreta o subconjunto de filtros GMP usado pelos conectores"""
+
+    def __init__(self, text):
+        text = text or ''
+        self.uuids = re.findall(r'uuid=(\S+)', text)
+        name = re.search(r'name="?([^"\s]+)"?', text)
+        self.name = name.group(1) if name else None
+        first = re.search(r'first=(\d+)', text)
+        self.first = int(first.group(1)) if first else 1
+        rows = re.search(r'rows=(-?\d+)', text)
+        self.rows = int(rows.group(1)) if rows else -1
+        severity = re.search(r'severity>(-?[\d.]+)', text)
+        self.min_severity = float(severity.group(1)) if severity else None
+
+
+class FakeGMPServer:
+    """
+    Servidor GMP local em thread de fundo (TCP+TLS ou socket Unix)
+
+    Exemplo:
+        with FakeGMPServer(results=100000, socket_path='/tmp/gvmd.sock') as server:
+            ...  # apontar OPENVAS_SOCKET_PATH/OPENVAS_HOST para o servidor
+
+    Args:
+        results: Quantidade de resultados sintéticos em cada relatório
+        scan_duration: Segundos até uma task iniciada chegar a 100%
+        latency: Atraso (segundos) antes de cada resposta
+        failure_rate: Probabilidade (0-1) de derrubar a conexão em um comando
+        socket_path: Usa socket Unix neste caminho em vez de TCP
+        tls: Em TCP, envolve a conexão em TLS (certificado gerado se necessário)
+        username/password: Se informados, authenticate valida as credenciais
+    """
+
+    def __init__(self, results=1000, scan_duration=1.0, latency=0.0, failure_rate=0.0,
+                 host='127.0.0.1', port=0, socket_path=None, tls=True,
+                 certfile=None, keyfile=None, username=None, password=None, seed=None):
+        self.results = results
+        self.scan_duration = scan_duration
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.tls = tls and not socket_path
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.username = username
+        self.password = password
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.targets = {}
+        self.tasks = {}
+        self.stats = {'connections': 0, 'commands': 0, 'dropped': 0, 'bytes_sent': 0}
+
+        self._server = None
+        self._thread = None
+        self._tmpdir = None
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Sobe o servidor em uma thread de fundo"""
+        handler = self._make_handler()
+
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, handler)
+        else:
+            self._server = socketserver.ThreadingTCPServer((self.host, self.port), handler)
+            self.port = self._server.server_address[1]
+
+            if self.tls:
+                if not (self.certfile and self.keyfile):
+                    self._tmpdir = tempfile.TemporaryDirectory()
+                    self.certfile, self.keyfile = generate_self_signed_cert(self._tmpdir.name)
+                context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+                context.load_cert_chain(self.certfile, self.keyfile)
+                self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def config(self, username='admin', password='admin'):
+        """Chaves de OPENVAS_CONFIG para apontar os conectores para este servidor"""
+        return {
+            'host': self.host,
+            'port': self.port,
+            'socket_path': self.socket_path or '',
+            'username': username,
+            'password': password
+        }
+
+    # ------------------------------------------------------------------
+    # Conexões
+    # ------------------------------------------------------------------
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                with server.lock:
+                    server.stats['connections'] += 1
+                try:
+                    server._serve_connection(self.request)
+                except (ConnectionError, ssl.SSLError, OSError):
+                    pass
+
+        return Handler
+
+    def _serve_connection(self, sock):
+        # Um parser por conexão, dentro de uma raiz sintética: comandos enviados
+        # em sequência (até no mesmo recv) são todos lidos, sem perder bytes
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        parser.feed(b'<commands>')
+        root = None
+        depth = 0
+
+        while True:
+            data = sock.recv(64 * 1024)
+            if not data:
+                return
+            parser.feed(data)
+
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    if root is None:
+                        root = elem
+                    continue
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                # Comando completo: sai da raiz para não acumular em memória
+                root.remove(elem)
+                with self.lock:
+                    self.stats['commands'] += 1
+
+                if self.failure_rate and self.random.random() < self.failure_rate:
+                    with self.lock:
+                        self.stats['dropped'] += 1
+                    sock.close()
+                    return
+                if self.latency:
+                    time.sleep(self.latency)
+
+                for chunk in self._dispatch(elem):
+                    sock.sendall(chunk)
+                    with self.lock:
+                        self.stats['bytes_sent'] += len(chunk)
+
+    def _dispatch(self, command):
+        handler = getattr(self, f"_cmd_{command.tag}", None)
+        if handler is None:
+            return [_response(command.tag, 400, "Bogus command name")]
+        return handler(command)
+
+    # ------------------------------------------------------------------
+    # Comandos GMP
+    # ------------------------------------------------------------------
+
+    def _cmd_authenticate(self, command):
+        username = command.findtext('credentials/username')
+        password = command.findtext('credentials/password')
+        if self.username is not None and (username, password) != (self.username, self.password):
+            return [_response('authenticate', 400, "Authentication failed")]
+        return [_response('authenticate', 200, "OK", body='<role>Admin</role><timezone>UTC</timezone>')]
+
+    def _cmd_get_version(self, command):
+        return [_response('get_version', 200, "OK", body=f'<version>{GMP_VERSION}</version>')]
+
+    def _cmd_create_target(self, command):
+        name = command.findtext('name')
+        target_id = str(uuid.uuid4())
+        with self.lock:
+            # Como o gvmd: nomes de target são únicos
+            if any(target['name'] == name for target in self.targets.values()):
+                return [_response('create_target', 400, "Target exists already")]
+            self.targets[target_id] = {
+                'name': name,
+                'hosts': command.findtext('hosts')
+            }
+        return [_response('create_target', 201, "OK, resource created", target_id)]
+
+    def _cmd_get_targets(self, command):
+        target_filter = _Filter(command.get('filter'))
+        with self.lock:
+            targets = list(self.targets.items())
+
+        body = [
+            f'<target id="{target_id}"><name>{escape(target["name"] or "")}</name>'
+            f'<hosts>{escape(target["hosts"] or "")}</hosts></target>'
+            for target_id, target in targets
+            if not target_filter.name or target['name'] == target_filter.name
+        ]
+        if target_filter.rows > 0:
+            body = body[target_filter.first - 1:target_filter.first - 1 + target_filter.rows]
+        return [_response('get_targets', 200, "OK", body=''.join(body))]
+
+    def _cmd_create_task(self, command):
+        target = command.find('target')
+        if target is None or target.get('id') not in self.targets:
+            return [_response('create_task', 404, "Failed to find target")]
+
+        task_id = str(uuid.uuid4())
+        with self.lock:
+            self.tasks[task_id] = {
+                'name': command.findtext('name'),
+                'target_id': target.get('id'),
+                'started_at': None,
+                'reports': [],
+                'scan_ends': {}  # report_id -> fim do scan (relatórios anteriores)
+            }
+        return [_response('create_task', 201, "OK, resource created", task_id)]
+
+    def _cmd_delete_task(self, command):
+        # Como no GSA: o target da task continua existindo
+        with self.lock:
+            task = self.tasks.pop(command.get('task_id'), None)
+        if task is None:
+            return [_response('delete_task', 404, "Failed to find task")]
+        return [_response('delete_task', 200, "OK")]
+
+    def _cmd_start_task(self, command):
+        task = self.tasks.get(command.get('task_id'))
+        if task is None:
+            return [_response('start_task', 404, "Failed to find task")]
+        if self._task_status(task)[0] == 'Running':
+            return [_response('start_task', 400, "Task is active already")]
+
+        report_id = str(uuid.uuid4())
+        with self.lock:
+            if task['reports']:
+                task['scan_ends'][task['reports'][-1]] = task['started_at'] + self.scan_duration
+            task['started_at'] = time.time()
+            task['stopped_at'] = None
+            task['reports'].append(report_id)
+        return [_response('start_task', 202, "OK, request submitted",
+                          body=f'<report_id>{report_id}</report_id>')]
+
+    def _cmd_stop_task(self, command):
+        task = self.tasks.get(command.get('task_id'))
+        if task is None:
+            return [_response('stop_task', 404, "Failed to find task")]
+        if self._task_status(task)[0] != 'Running':
+            return [_response('stop_task', 400, "Task is not running")]
+        with self.lock:
+            task['stopped_at'] = time.time()
+        return [_response('stop_task', 202, "OK, request submitted")]
+
+    def _task_status(self, task):
+        if task['started_at'] is None:
+            return 'New', -1
+        if not self.scan_duration:
+            return 'Done', 100
+        ended = task.get('stopped_at') or time.time()
+        progress = int((ended - task['started_at']) / self.scan_duration * 100)
+        if progress >= 100:
+            return 'Done', 100
+        if task.get('stopped_at'):
+            return 'Stopped', progress
+        return 'Running', progress
+
+    def _cmd_get_tasks(self, command):
+        task_filter = _Filter(command.get('filter'))
+        with self.lock:
+            tasks = list(self.tasks.items())
+
+        body = []
+        for task_id, task in tasks:
+            if task_filter.uuids and task_id not in task_filter.uuids:
+                continue
+            if task_filter.name and task['name'] != task_filter.name:
+                continue
+
+            status, progress = self._task_status(task)
+            reports = ''
+            if task['reports']:
+                last = task['reports'][-1] if status == 'Done' else task['reports'][-2] if len(task['reports']) > 1 else None
+                if last:
+                    # Fim do scan: identifica a versão final do relatório (usado no cache do conector)
+                    ended = task['scan_ends'].get(last, task['started_at'] + self.scan_duration)
+                    scan_end = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ended))
+                    reports += (f'<last_report><report id="{last}"><scan_end>{scan_end}</scan_end>'
+                                f'</report></last_report>')
+                if status != 'Done':
+                    reports += f'<current_report><report id="{task["reports"][-1]}"/></current_report>'
+
+            body.append(
+                f'<task id="{task_id}"><name>{escape(task["name"] or "")}</name>'
+                f'<target id="{task["target_id"]}"/>'
+                f'<status>{status}</status><progress>{progress}</progress>{reports}</task>'
+            )
+
+        if task_filter.rows > 0:
+            body = body[task_filter.first - 1:task_filter.first - 1 + task_filter.rows]
+        return [_response('get_tasks', 200, "OK", body=''.join(body))]
+
+    def _matching_count(self, min_severity):
+        """Quantos resultados passam no filtro de severidade (sem percorrer todos)"""
+        if min_severity is None:
+            return self.results
+        period_hits = sum(1 for i in range(_SEVERITY_PERIOD) if synthetic_severity(i) > min_severity)
+        full, rest = divmod(self.results, _SEVERITY_PERIOD)
+        return full * period_hits + sum(1 for i in range(rest) if synthetic_severity(i) > min_severity)
+
+    def _cmd_get_report(self, command):
+        report_id = command.get('report_id')
+        known = any(report_id in task['reports'] for task in self.tasks.values())
+        if not known:
+            return [_response('get_report', 404, "Failed to find report")]
+
+        if command.get('ignore_pagination') == '1':
+            report_filter = _Filter(None)
+        else:
+            report_filter = _Filter(command.get('filter'))
+        return self._stream_report(report_id, report_filter)
+
+    def _stream_report(self, report_id, report_filter):
+        """Gera o relatório em pedaços para não montar o XML inteiro em memória"""
+        filtered = self._matching_count(report_filter.min_severity)
+        first = max(report_filter.first, 1)
+        rows = report_filter.rows if report_filter.rows > 0 else filtered
+
+        yield (
+            f'<get_reports_response status="200" status_text="OK">'
+            f'<report id="{report_id}" format_id="a994b278-1f62-11e1-96ac-406186ea4fc5">'
+            f'<report id="{report_id}"><scan_run_status>Done</scan_run_status>'
+            f'<results start="{first}" max="{rows}">'
+        ).encode()
+
+        batch = []
+        matched = 0
+        sent = 0
+        index = 0
+        while index < self.results and sent < rows:
+            if report_filter.min_severity is None or synthetic_severity(index) > report_filter.min_severity:
+                matched += 1
+                if matched >= first:
+                    batch.append(synthetic_result_xml(index))
+                    sent += 1
+                    if len(batch) >= _WRITE_BATCH:
+                        yield ''.join(batch).encode()
+                        batch = []
+            index += 1
+
+        yield (
+            ''.join(batch) +
+            f'</results><result_count>{self.results}<full>{self.results}</full>'
+            f'<filtered>{filtered}</filtered></result_count>'
+            f'</report></report></get_reports_response>'
+        ).encode()
+
+
+def _response(command, status, status_text, resource_id=None, body=''):
+    attributes = f' id="{resource_id}"' if resource_id else ''
+    return (
+        f'<{command}_response status="{status}" status_text="{escape(status_text)}"{attributes}>'
+        f'{body}</{command}_response>'
+    ).encode()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servidor GMP falso para testes locais")
+    parser.add_argument('--results', type=int, default=1000)
+    parser.add_argument('--port', type=int, default=9390)
+    parser.add_argument('--socket', dest='socket_path')
+    parser.add_argument('--scan-duration', type=float, default=30.0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeGMPServer(
+        results=args.results, port=args.port, socket_path=args.socket_path,
+        scan_duration=args.scan_duration, latency=args.latency, failure_rate=args.failure_rate
+    ).start()
+    where = args.socket_path or f"{server.host}:{server.port} (TLS)"
+    print(f"🧪 Servidor GMP falso em {where} - Ctrl+C para parar")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
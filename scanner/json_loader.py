@@ -0,0 +1,160 @@
+"""
+Leitura Incremental de Resultados Exportados em JSON
+Lê exportações grandes (array JSON ou JSON Lines, opcionalmente .gz)
+registro a registro, sem carregar o arquivo inteiro na memória
+"""
+
+import os
+import sys
+import gzip
+import json
+from itertools import chain, islice
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from alerting.email_config import REPORT_CONFIG
+except ImportError:
+    REPORT_CONFIG = {}
+
+# Tamanho de cada leitura do arquivo (caracteres)
+READ_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+
+
+class ResultFileError(Exception):
+    """Arquivo de resultados inválido; informa quantos registros foram lidos antes do erro"""
+
+    def __init__(self, message, records_read=0):
+        super().__init__(message)
+        self.records_read = records_read
+
+
+def _open_text(filename):
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt', encoding='utf-8')
+    return open(filename, 'r', encoding='utf-8')
+
+
+def _skip_whitespace(buffer, pos):
+    while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+        pos += 1
+    return pos
+
+
+def _iter_array(f, buffer):
+    """Registros de um array JSON no nível raiz: [ {...}, {...} ]"""
+    pos = 1  # depois do "["
+    count = 0
+    eof = False
+    expect_value = True
+
+    while True:
+        pos = _skip_whitespace(buffer, pos)
+        if pos < len(buffer):
+            if not expect_value:
+                if buffer[pos] == ',':
+                    pos += 1
+                    expect_value = True
+                    continue
+                if buffer[pos] == ']':
+                    return
+                raise ResultFileError(f"JSON inválido após {count} registros: esperado ',' ou ']'", count)
+
+            if buffer[pos] == ']' and count == 0:
+                return  # array vazio
+            try:
+                record, end = _decoder.raw_decode(buffer, pos)
+                # Um valor que termina no fim do buffer pode estar incompleto (ex.: número)
+                if end < len(buffer) or eof:
+                    yield record
+                    count += 1
+                    pos = end
+                    expect_value = False
+                    continue
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ResultFileError(f"JSON inválido após {count} registros: {e.msg}", count)
+
+        if eof:
+            raise ResultFileError(f"Arquivo truncado após {count} registros", count)
+
+        # Descarta o que já foi processado e lê mais um pedaço
+        data = f.read(READ_SIZE)
+        buffer = buffer[pos:] + data
+        pos = 0
+        eof = not data
+
+
+def _iter_lines(f, first_chunk):
+    """Registros de um arquivo JSON Lines: um objeto por linha"""
+    count = 0
+
+    # O primeiro pedaço já foi lido; sua última linha pode continuar no arquivo
+    for number, line in enumerate(_join_lines(chain(first_chunk.splitlines(keepends=True), f)), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+            count += 1
+        except json.JSONDecodeError as e:
+            raise ResultFileError(f"Linha {number} inválida após {count} registros: {e.msg}", count)
+
+
+def _join_lines(pieces):
+    """Junta pedaços em linhas completas"""
+    pending = ''
+    for piece in pieces:
+        pending += piece
+        if pending.endswith('\n'):
+            yield pending
+            pending = ''
+    if pending:
+        yield pending
+
+
+def iter_json_records(filename):
+    """
+    Gera os registros de uma exportação JSON, um por vez
+
+    Formatos aceitos (detectados pelo conteúdo, .gz descompactado na leitura):
+    - array JSON no nível raiz: [{...}, {...}]
+    - JSON Lines: um objeto por linha
+
+    Raises:
+        FileNotFoundError: Arquivo inexistente
+        ResultFileError: Conteúdo inválido ou truncado (com os registros já lidos)
+    """
+    with _open_text(filename) as f:
+        chunk = f.read(READ_SIZE)
+        start = _skip_whitespace(chunk, 0)
+        while start == len(chunk):
+            data = f.read(READ_SIZE)
+            if not data:
+                return  # arquivo vazio
+            chunk = chunk[start:] + data
+            start = _skip_whitespace(chunk, 0)
+
+        if chunk[start] == '[':
+            yield from _iter_array(f, chunk[start:])
+        else:
+            yield from _iter_lines(f, chunk)
+
+
+def iter_json_batches(filename, batch_size=None):
+    """
+    Registros da exportação em listas de até batch_size (para análise em blocos)
+    """
+    return batched(iter_json_records(filename), batch_size)
+
+
+def batched(records, batch_size=None):
+    """Agrupa um iterável de registros em listas de até batch_size"""
+    batch_size = batch_size or REPORT_CONFIG.get('stream_chunk_size', 10000)
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
@@ -4,8 +4,13 @@ Conecta com API do OpenVAS para realizar scans reais
 """
 
 import os
+import ssl
+import inspect
 import sys
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Importações condicionais
@@ -14,6 +19,7 @@ try:
     from gvm.protocols.gmp import Gmp
     from gvm.transforms import EtreeTransform
     from gvm.xml import pretty_print
+    from gvm.errors import GvmError
     GVM_AVAILABLE = True
 except ImportError:
     GVM_AVAILABLE = False
@@ -25,6 +31,12 @@ except ImportError:
 
 # Importar configurações
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scanner.report_parser import iter_results
+from scanner.adaptive_poller import AdaptivePoller
+from scanner.task_cache import TaskCache, scan_key
+from scanner.report_cache import ReportCache, report_key
+from processing.vuln_analysis import build_frame, frame_records
+
 try:
     from alerting.email_config import OPENVAS_CONFIG, get_mode, is_openvas_configured
 except ImportError:
@@ -39,6 +51,236 @@ except ImportError:
     get_mode = lambda: 'development'
     is_openvas_configured = lambda: False
 
+# Status de tasks que já estão em execução (não devem ser iniciadas de novo)
+ACTIVE_TASK_STATUSES = ["Running", "Requested", "Queued"]
+
+# Falhas de transporte (socket caiu, TLS, timeout): vale reconectar e repetir
+RETRYABLE_ERRORS = (OSError, ssl.SSLError, EOFError)
+
+
+def is_transport_error(error):
+    """
+    Falha de transporte (vale reconectar e repetir)?
+    
+    Além dos erros de socket, o python-gvm levanta o GvmError base (a própria
+    classe) ao ler ou fechar o socket; as subclasses (RequiredArgument,
+    InvalidArgument, respostas do gvmd...) são erros que repetir não resolve.
+    """
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    return GVM_AVAILABLE and type(error) is GvmError
+
+
+def retry_wait(error, attempt, retries, had_session):
+    """
+    Política de nova tentativa comum aos conectores síncrono e assíncrono
+    
+    Returns:
+        float: Segundos a aguardar antes de reconectar e repetir, ou None
+               se não vale repetir (erro que não é de transporte ou última tentativa)
+    """
+    if not is_transport_error(error) or attempt >= retries - 1:
+        return None
+    
+    # Socket ocioso derrubado pelo servidor: reconectar sem esperar
+    wait_time = 0 if had_session and attempt == 0 else (attempt + 1) * 5
+    print(f"⚠️ Erro na tentativa {attempt + 1}: {type(error).__name__}: {error}")
+    print(f"🔄 Tentando novamente em {wait_time}s...")
+    return wait_time
+
+# ----------------------------------------------------------------------
+# Lógica comum aos conectores síncrono e assíncrono (sem E/S)
+# ----------------------------------------------------------------------
+
+def scan_config_ids():
+    """IDs de configuração e scanner (padrão: "Full and fast" / OpenVAS Default)"""
+    config_id = OPENVAS_CONFIG.get('scan_config_id', 'daba56c8-73ec-11df-a475-002264764cea')
+    scanner_id = OPENVAS_CONFIG.get('scanner_id', '08b69003-5fc2-4037-a479-93b440211c73')
+    return config_id, scanner_id
+
+
+def scan_names(hosts):
+    """Chave de cache e nomes determinísticos de target/task para os hosts"""
+    key = scan_key(hosts, *scan_config_ids())
+    return key, f"AutoTarget_{key[:16]}", f"Scan_{key[:16]}"
+
+
+def open_task_cache():
+    return TaskCache(OPENVAS_CONFIG.get('task_cache_file', 'reports/task_cache.json'))
+
+
+def build_result_filter(first=None, rows=None):
+    """
+    Filtro de resultados aplicado pelo próprio OpenVAS (severidade e QoD)
+    
+    Com `first`/`rows`, acrescenta a paginação (rows=-1: todos).
+    """
+    min_severity = OPENVAS_CONFIG.get('report_min_severity', 0.1)
+    min_qod = OPENVAS_CONFIG.get('report_min_qod', 70)
+    # Filtro GMP não tem ">=": severidades têm uma casa decimal
+    base = f"severity>{min_severity - 0.01:.2f} min_qod={min_qod} apply_overrides=0"
+    if first is None:
+        return base
+    return f"{base} first={first} rows={rows}"
+
+
+def name_filter(name):
+    """Filtro GMP pelo nome exato (tasks e targets)"""
+    return f'name="{name}" first=1 rows=1'
+
+
+def parse_found_task(tasks):
+    """(task_id, target_id) da resposta de get_tasks filtrada por nome"""
+    task = tasks.find('task') if hasattr(tasks, 'find') else None
+    if task is None:
+        return None, None
+    target = task.find('target')
+    return task.get('id'), target.get('id') if target is not None else None
+
+
+def parse_found_target(targets):
+    """ID do target na resposta de get_targets filtrada por nome"""
+    target = targets.find('target') if hasattr(targets, 'find') else None
+    return target.get('id') if target is not None else None
+
+
+def parse_last_report(tasks):
+    """
+    Último relatório na resposta de get_tasks
+    
+    Returns:
+        tuple: (ID do relatório, fim do scan) - fim vazio se o relatório
+               ainda não terminou; None se a task não tiver relatórios
+    """
+    task = tasks.find('task') if hasattr(tasks, 'find') else None
+    if task is None:
+        return None
+    reports = task.findall('.//report')
+    if not reports:
+        return None
+    return reports[-1].get('id'), (reports[-1].findtext('scan_end') or '').strip()
+
+
+def lookup_cached_report(report_cache, report):
+    """
+    Entrada de cache de um relatório (resultado de parse_last_report)
+    
+    Returns:
+        tuple: (report_id, chave de cache ou None, DataFrame ou None)
+    """
+    if not report:
+        return None, None, None
+    
+    report_id, scan_end = report
+    if not scan_end:
+        return report_id, None, None  # relatório em andamento: não cachear
+    
+    key = report_key(report_id, scan_end, build_result_filter())
+    cached = report_cache.get(key)
+    if cached is not None:
+        print(f"♻️ Relatório {report_id} carregado do cache local: {len(cached)} resultados")
+    return report_id, key, cached
+
+
+def resolve_task(hosts, task_cache):
+    """
+    Passos de get_or_create_task, independentes de como o GMP é chamado
+    
+    Consulta o cache local (TASK_CACHE_FILE) e, se não houver entrada,
+    procura a task pelo nome determinístico antes de criar a task; o target
+    também é procurado pelo nome antes de ser criado (apagar a task no GSA
+    mantém o target, e o gvmd recusa nomes de target repetidos).
+    
+    Gera pedidos (operação, argumentos...) e recebe a resposta de cada um;
+    executado por execute_steps (assíncrono) ou run_steps (síncrono). Operações:
+    'status' (task_id -> (status, progresso)), 'find' (nome -> (task_id, target_id)),
+    'find_target' (nome -> target_id), 'create_target' (nome, hosts -> id)
+    e 'create_task' (target_id, nome -> id).
+    
+    Returns:
+        dict: {'target_id', 'task_id', 'hosts', 'status'} ou None em caso de erro
+    """
+    key, target_name, task_name = scan_names(hosts)
+    
+    entry = task_cache.get(key)
+    if entry:
+        status, _ = yield ('status', entry['task_id'])
+        if status not in ["Unknown", "Error"]:
+            print(f"♻️ Reutilizando task {task_name} ({entry['task_id']}) - status: {status}")
+            return {**entry, 'status': status}
+        # Task apagada no OpenVAS: descartar entrada
+        task_cache.remove(key)
+        
+    try:
+        task_id, target_id = yield ('find', task_name)
+    except Exception as e:
+        print(f"⚠️ Erro ao procurar task existente: {e}")
+        task_id, target_id = None, None
+        
+    if task_id:
+        status, _ = yield ('status', task_id)
+        print(f"♻️ Task {task_name} encontrada no OpenVAS ({task_id})")
+    else:
+        try:
+            target_id = yield ('find_target', target_name)
+        except Exception as e:
+            print(f"⚠️ Erro ao procurar target existente: {e}")
+            target_id = None
+            
+        if target_id:
+            print(f"♻️ Target {target_name} encontrado no OpenVAS ({target_id})")
+        else:
+            target_id = yield ('create_target', target_name, hosts)
+            if not target_id:
+                return None
+        task_id = yield ('create_task', target_id, task_name)
+        if not task_id:
+            return None
+        status = "New"
+        
+    entry = {'target_id': target_id, 'task_id': task_id, 'hosts': hosts}
+    task_cache.set(key, entry)
+    return {**entry, 'status': status}
+
+
+async def execute_steps(steps, handlers):
+    """
+    Executa um gerador de passos (ex.: resolve_task)
+    
+    Handlers síncronos ou assíncronos; a exceção de um handler é lançada
+    dentro do gerador, que decide se continua.
+    """
+    try:
+        request = next(steps)
+        while True:
+            operation, *args = request
+            try:
+                response = handlers[operation](*args)
+                if inspect.isawaitable(response):
+                    response = await response
+            except Exception as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(response)
+    except StopIteration as done:
+        return done.value
+
+
+def run_steps(steps, handlers):
+    """
+    execute_steps com handlers síncronos, sem event loop
+    
+    Sem handlers assíncronos a corrotina nunca suspende: termina no primeiro send.
+    """
+    coroutine = execute_steps(steps, handlers)
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError("run_steps não aceita handlers assíncronos - use execute_steps")
+
+
 class OpenVASConnector:
     """
     Classe para conectar com OpenVAS/GVM e executar scans
@@ -47,6 +289,17 @@ class OpenVASConnector:
     def __init__(self):
         self.connection = None
         self.connected = False
+        # Sessão GMP autenticada reutilizada entre comandos
+        self.gmp = None
+        self.session_stats = {
+            'handshakes': 0,   # conexões TLS/socket abertas (inclui detecção de versão)
+            'auths': 0,        # autenticações realizadas
+            'reconnects': 0,   # reconexões após queda do socket
+            'commands': 0      # comandos GMP executados
+        }
+        self.task_cache = None
+        self.report_cache = ReportCache()
+        self.transport = None  # 'unix' ou 'tls', definido em connect()
         
     def connect(self):
         """Conecta com o OpenVAS/GVM"""
@@ -54,15 +307,27 @@ class OpenVASConnector:
             raise ImportError("python-gvm não está instalado. Execute: pip install python-gvm")
             
         try:
-            # Criar conexão TLS
-            self.connection = TLSConnection(
-                hostname=OPENVAS_CONFIG['host'],
-                port=OPENVAS_CONFIG['port']
-            )
+            socket_path = OPENVAS_CONFIG.get('socket_path')
+            
+            if socket_path and os.path.exists(socket_path):
+                # gvmd na mesma máquina: socket Unix evita handshake e criptografia TLS
+                self.connection = UnixSocketConnection(path=socket_path)
+                self.transport = 'unix'
+                print(f"✅ Conexão criada para OpenVAS via socket Unix {socket_path}")
+            else:
+                if socket_path:
+                    print(f"⚠️ Socket {socket_path} não encontrado - usando TLS")
+                    
+                # Criar conexão TLS (com OPENVAS_CAFILE, valida o certificado do gvmd)
+                self.connection = TLSConnection(
+                    hostname=OPENVAS_CONFIG['host'],
+                    port=OPENVAS_CONFIG['port'],
+                    cafile=OPENVAS_CONFIG.get('cafile') or None
+                )
+                self.transport = 'tls'
+                print(f"✅ Conexão criada para OpenVAS em {OPENVAS_CONFIG['host']}:{OPENVAS_CONFIG['port']}")
             
             self.connected = True
-            print(f"✅ Conexão criada para OpenVAS em {OPENVAS_CONFIG['host']}:{OPENVAS_CONFIG['port']}")
-            return True
             return True
             
         except Exception as e:
@@ -73,45 +338,104 @@ class OpenVASConnector:
     def disconnect(self):
         """Desconecta do OpenVAS"""
         try:
+            self._close_session()
             if hasattr(self, 'connection') and self.connection:
                 self.connection.disconnect()
         except:
             pass
         finally:
             self.connected = False
-            print("🔌 Desconectado do OpenVAS")
+            print(f"🔌 Desconectado do OpenVAS "
+                  f"(handshakes: {self.session_stats['handshakes']} | "
+                  f"autenticações: {self.session_stats['auths']} | "
+                  f"comandos: {self.session_stats['commands']})")
+            
+    def get_session_stats(self):
+        """Retorna contadores da sessão GMP (handshakes, autenticações, reconexões)"""
+        return dict(self.session_stats)
+            
+    def _ensure_session(self):
+        """Retorna a sessão GMP autenticada, reconectando apenas se o socket caiu"""
+        if self.gmp is not None and self.gmp.is_connected():
+            return self.gmp
+            
+        if self.gmp is None:
+            # Primeira sessão: detectar versão GMP (abre e fecha uma conexão)
+            self.gmp = Gmp(
+                connection=self.connection, 
+                transform=EtreeTransform()
+            ).determine_supported_gmp()
+            self.session_stats['handshakes'] += 1
+        else:
+            self.session_stats['reconnects'] += 1
+            print("🔄 Sessão GMP perdida - reconectando...")
+            
+        self.gmp.connect()
+        self.session_stats['handshakes'] += 1
+        
+        response = self.gmp.authenticate(
+            OPENVAS_CONFIG['username'],
+            OPENVAS_CONFIG['password']
+        )
+        self.session_stats['auths'] += 1
+
+        if not str(response.get('status', '')).startswith('2'):
+            self._close_session()
+            raise Exception(f"Falha na autenticação GMP: {response.get('status_text', 'Unknown')}")
+        return self.gmp
+        
+    def _close_session(self):
+        """Encerra a sessão GMP persistente"""
+        if self.gmp is not None:
+            try:
+                self.gmp.disconnect()
+            finally:
+                self.gmp = None
+                
+    def _drop_connection(self):
+        """
+        Fecha o socket da sessão, mantendo a versão GMP já detectada
+        
+        A próxima chamada a _ensure_session reconecta e autentica de novo.
+        """
+        if self.gmp is not None:
+            try:
+                self.gmp.disconnect()
+            except Exception:
+                pass
+                
+    def _should_retry(self, error, attempt, retries, had_session):
+        """
+        Decide pela classe da exceção se vale reconectar e repetir
+        
+        Em caso afirmativo, fecha o socket e aguarda antes da nova tentativa.
+        """
+        if is_transport_error(error):
+            # Socket quebrado pode continuar "conectado" para o python-gvm
+            self._drop_connection()
+        
+        wait_time = retry_wait(error, attempt, retries, had_session)
+        if wait_time is None:
+            return False
+        time.sleep(wait_time)
+        return True
             
     def _execute_gmp_command(self, command_func, retries=3):
-        """Executa comando GMP com context manager e retry"""
+        """Executa comando GMP na sessão persistente com retry"""
         if not self.connected:
             raise Exception("Não conectado ao OpenVAS")
-            
-        last_error = None
         
         for attempt in range(retries):
+            had_session = self.gmp is not None and self.gmp.is_connected()
             try:
-                with Gmp(connection=self.connection, transform=EtreeTransform()) as gmp:
-                    # Autenticar com timeout
-                    gmp.authenticate(
-                        OPENVAS_CONFIG['username'], 
-                        OPENVAS_CONFIG['password']
-                    )
-                    return command_func(gmp)
+                gmp = self._ensure_session()
+                self.session_stats['commands'] += 1
+                return command_func(gmp)
                     
             except Exception as e:
-                last_error = e
-                error_msg = str(e).lower()
-                
-                # Verificar se é erro de timeout ou conexão
-                if any(keyword in error_msg for keyword in ['timeout', 'connection', 'ssl', 'eof']):
-                    if attempt < retries - 1:
-                        wait_time = (attempt + 1) * 5
-                        print(f"⚠️ Erro na tentativa {attempt + 1}: {e}")
-                        print(f"🔄 Tentando novamente em {wait_time}s...")
-                        time.sleep(wait_time)
-                        continue
-                        
-                raise Exception(f"Erro no comando GMP após {retries} tentativas: {e}")
+                if self._should_retry(e, attempt, retries, had_session):
+                    continue
+                raise Exception(f"Erro no comando GMP após {attempt + 1} tentativa(s): {e}") from e
             
     def create_target(self, name, hosts):
         """Cria um target para scan"""
@@ -127,15 +451,46 @@ class OpenVASConnector:
             print(f"❌ Erro ao criar target: {e}")
             return None
             
-    def start_scan(self, target_id, scan_name=None):
-        """Inicia um scan"""
+    def _find_task_by_name(self, name):
+        """Procura no OpenVAS uma task pelo nome exato; retorna (task_id, target_id)"""
+        def _find(gmp):
+            return parse_found_task(gmp.get_tasks(filter_string=name_filter(name), details=False))
+            
+        return self._execute_gmp_command(_find)
+        
+    def _find_target_by_name(self, name):
+        """Procura no OpenVAS um target pelo nome exato; retorna target_id ou None"""
+        def _find(gmp):
+            return parse_found_target(gmp.get_targets(filter_string=name_filter(name)))
+            
+        return self._execute_gmp_command(_find)
+        
+    def get_or_create_task(self, hosts):
+        """
+        Reutiliza target/task existentes para os mesmos hosts e configuração
+        (passos em resolve_task, compartilhados com o conector assíncrono)
+        
+        Returns:
+            dict: {'target_id', 'task_id', 'status'} ou None em caso de erro
+        """
+        if self.task_cache is None:
+            self.task_cache = open_task_cache()
+        
+        return run_steps(resolve_task(hosts, self.task_cache), {
+            'status': self.get_task_status,
+            'find': self._find_task_by_name,
+            'find_target': self._find_target_by_name,
+            'create_target': self.create_target,
+            'create_task': self.create_task
+        })
+        
+    def create_task(self, target_id, scan_name=None):
+        """Cria uma task de scan para o target (sem iniciar)"""
         if not scan_name:
             scan_name = f"Scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        def _start_scan(gmp):
-            # Usar configuração padrão "Full and fast"
-            config_id = OPENVAS_CONFIG.get('scan_config_id', 'daba56c8-73ec-11df-a475-002264764cea')
-            scanner_id = OPENVAS_CONFIG.get('scanner_id', '08b69003-5fc2-4037-a479-93b440211c73')
+        def _create_task(gmp):
+            config_id, scanner_id = scan_config_ids()
             
             response = gmp.create_task(
                 name=scan_name,
@@ -146,28 +501,57 @@ class OpenVASConnector:
             
             task_id = response.get('id')
             print(f"📋 Task criada: {scan_name} ({task_id})")
+            return task_id
             
-            # Iniciar scan
+        try:
+            return self._execute_gmp_command(_create_task)
+        except Exception as e:
+            print(f"❌ Erro ao criar task: {e}")
+            return None
+            
+    def start_task(self, task_id):
+        """Inicia uma task já existente"""
+        def _start_task(gmp):
             gmp.start_task(task_id)
-            print(f"🚀 Scan iniciado: {scan_name}")
-            return task_id
+            print(f"🚀 Scan iniciado: {task_id}")
+            return True
             
         try:
-            return self._execute_gmp_command(_start_scan)
+            return self._execute_gmp_command(_start_task)
         except Exception as e:
-            print(f"❌ Erro ao iniciar scan: {e}")
+            print(f"❌ Erro ao iniciar task: {e}")
+            return False
+            
+    def stop_task(self, task_id):
+        """Para uma task em execução"""
+        def _stop_task(gmp):
+            gmp.stop_task(task_id)
+            print(f"⏹️ Parada solicitada: {task_id}")
+            return True
+            
+        try:
+            return self._execute_gmp_command(_stop_task)
+        except Exception as e:
+            print(f"❌ Erro ao parar task: {e}")
+            return False
+            
+    def start_scan(self, target_id, scan_name=None):
+        """Cria e inicia um scan"""
+        task_id = self.create_task(target_id, scan_name)
+        
+        if not task_id or not self.start_task(task_id):
             return None
+        return task_id
             
     def get_task_status(self, task_id):
-        """Verifica o status de uma task"""
+        """Verifica o status de uma task (consulta leve, sem detalhes)"""
         def _get_status(gmp):
-            tasks = gmp.get_tasks(filter_string=f"uuid={task_id}")
-            if hasattr(tasks, 'xpath'):
-                task = tasks.xpath('task')[0] if tasks.xpath('task') else None
-                if task:
-                    status = task.find('status').text
-                    progress = task.find('progress')
-                    progress_value = progress.text if progress is not None else "0"
+            tasks = gmp.get_tasks(filter_string=f"uuid={task_id} rows=1", details=False)
+            if hasattr(tasks, 'find'):
+                task = tasks.find('task')
+                if task is not None:
+                    status = task.findtext('status', 'Unknown')
+                    progress_value = task.findtext('progress', '0').strip() or "0"
                     return status, progress_value
             return "Unknown", "0"
             
@@ -177,74 +561,242 @@ class OpenVASConnector:
             print(f"❌ Erro ao verificar status: {e}")
             return "Error", "0"
             
-    def wait_for_completion(self, task_id, max_wait=1800):  # 30 minutos
-        """Aguarda o scan completar"""
+    def get_tasks_status(self, task_ids):
+        """
+        Verifica o status de várias tasks em uma única consulta GMP
+        
+        Returns:
+            dict: {task_id: (status, progresso)} - tasks não encontradas
+            vêm como ("Unknown", "0")
+        """
+        task_ids = list(task_ids)
+        if not task_ids:
+            return {}
+            
+        def _get_status(gmp):
+            uuid_filter = " or ".join(f"uuid={task_id}" for task_id in task_ids)
+            tasks = gmp.get_tasks(
+                filter_string=f"{uuid_filter} first=1 rows={len(task_ids)}",
+                details=False
+            )
+            
+            statuses = {task_id: ("Unknown", "0") for task_id in task_ids}
+            if hasattr(tasks, 'findall'):
+                for task in tasks.findall('task'):
+                    progress_value = task.findtext('progress', '0').strip() or "0"
+                    statuses[task.get('id')] = (task.findtext('status', 'Unknown'), progress_value)
+            return statuses
+            
+        try:
+            return self._execute_gmp_command(_get_status)
+        except Exception as e:
+            print(f"❌ Erro ao verificar status: {e}")
+            return {task_id: ("Error", "0") for task_id in task_ids}
+            
+    def wait_for_completion(self, task_id, max_wait=None):
+        """Aguarda o scan completar consultando o status em intervalos adaptativos"""
+        max_wait = max_wait or OPENVAS_CONFIG.get('max_wait', 1800)  # padrão: 30 minutos
         start_time = time.time()
+        poller = AdaptivePoller()
         print(f"⏳ Aguardando conclusão do scan {task_id}...")
         
         while time.time() - start_time < max_wait:
             status, progress = self.get_task_status(task_id)
-            print(f"📊 Status: {status} | Progresso: {progress}%")
             
             if status in ["Done", "Stopped"]:
                 print(f"✅ Scan concluído: {status}")
                 return True
-            elif status == "Running":
-                time.sleep(30)  # Aguarda 30 segundos
-            else:
+                
+            interval = poller.update(progress)
+            print(f"📊 Status: {status} | Progresso: {progress}% | "
+                  f"ETA: {poller.format_eta()} | Próxima consulta em {interval:.0f}s")
+            
+            if status not in ["Running", "Requested", "Queued", "New"]:
                 print(f"⚠️ Status inesperado: {status}")
-                time.sleep(30)
+                
+            remaining = max_wait - (time.time() - start_time)
+            time.sleep(max(0, min(interval, remaining)))
         
         print("⏰ Timeout aguardando conclusão do scan")
         return False
         
-    def get_scan_results(self, task_id):
-        """Obtém os resultados do scan"""
-        def _get_results(gmp):
-            # Obter IDs dos relatórios
-            tasks = gmp.get_tasks(filter_string=f"uuid={task_id}")
-            if not hasattr(tasks, 'xpath') or not tasks.xpath('task'):
-                return []
+    def _get_last_report(self, task_id):
+        """
+        Obtém o último relatório da task
+        
+        Returns:
+            tuple: (ID do relatório, fim do scan) - fim vazio se o relatório
+                   ainda não terminou; None se a task não tiver relatórios
+        """
+        def _get_report(gmp):
+            return parse_last_report(gmp.get_tasks(filter_string=f"uuid={task_id}"))
+            
+        return self._execute_gmp_command(_get_report)
+        
+    def _get_last_report_id(self, task_id):
+        """Obtém o ID do último relatório da task"""
+        report = self._get_last_report(task_id)
+        return report[0] if report else None
+        
+    def stream_report(self, report_id, filter_string=None, summary=None, retries=3):
+        """
+        Gera as vulnerabilidades de um relatório uma a uma
+        
+        Envia <get_report> direto na conexão da sessão e alimenta o parser
+        incremental com cada pedaço lido do socket, sem montar o XML inteiro.
+        Sem `filter_string` o relatório vem completo (sem paginação).
+        
+        Se o socket cair no meio, reconecta e pede o relatório de novo,
+        pulando os resultados já entregues (mesmo filtro, mesma ordem).
+        """
+        if not self.connected:
+            raise Exception("Não conectado ao OpenVAS")
+        
+        attributes = {'report_id': report_id, 'details': '1'}
+        if filter_string:
+            attributes['filter'] = filter_string
+        else:
+            attributes['ignore_pagination'] = '1'
+        request = ET.tostring(ET.Element('get_report', attributes))
+        
+        def _read_chunks():
+            while True:
+                yield self.connection.read()
+        
+        delivered = 0
+        for attempt in range(retries):
+            had_session = self.gmp is not None and self.gmp.is_connected()
+            finished = False
+            try:
+                self._ensure_session()
+                self.session_stats['commands'] += 1
+                self.connection.send(request)
                 
-            task = tasks.xpath('task')[0]
-            reports = task.xpath('.//report')
+                skip = delivered
+                for vuln in iter_results(_read_chunks(), summary):
+                    if skip:
+                        skip -= 1
+                        continue
+                    delivered += 1
+                    yield vuln
+                finished = True
+                return
+            except Exception as e:
+                if self._should_retry(e, attempt, retries, had_session):
+                    continue
+                raise Exception(f"Erro ao baixar relatório após {attempt + 1} tentativa(s): {e}") from e
+            finally:
+                # Resposta lida pela metade deixa lixo no socket: descartar conexão
+                if not finished:
+                    self._drop_connection()
+                
+    def _fetch_page(self, local, report_id, filter_string):
+        """Baixa uma página do relatório na sessão própria da thread"""
+        connector = getattr(local, 'connector', None)
+        if connector is None:
+            connector = OpenVASConnector()
+            if not connector.connect():
+                raise Exception("Falha ao abrir conexão para página do relatório")
+            local.connector = connector
+            with self._page_lock:
+                self._page_connectors.append(connector)
+        return list(connector.stream_report(report_id, filter_string))
+        
+    def iter_report_pages(self, report_id, page_size=None, workers=None):
+        """
+        Gera as vulnerabilidades do relatório em páginas (first/rows)
+        
+        A primeira página é lida na sessão principal e informa o total de
+        resultados; as demais são baixadas por `workers` conexões em paralelo,
+        mantendo no máximo `workers` páginas à frente do consumidor.
+        """
+        page_size = page_size or OPENVAS_CONFIG.get('report_page_size', 1000)
+        workers = workers or OPENVAS_CONFIG.get('report_fetch_workers', 2)
+        
+        summary = {}
+        count = 0
+        for vuln in self.stream_report(report_id, build_result_filter(1, page_size), summary):
+            count += 1
+            yield vuln
             
-            if not reports:
+        total = summary.get('filtered')
+        
+        if total is None or workers <= 1:
+            # Sequencial: segue até receber uma página incompleta
+            first = page_size + 1
+            while count == page_size and (total is None or first <= total):
+                count = 0
+                for vuln in self.stream_report(report_id, build_result_filter(first, page_size)):
+                    count += 1
+                    yield vuln
+                first += page_size
+            return
+        
+        firsts = list(range(page_size + 1, total + 1, page_size))
+        print(f"📄 Relatório com {total} resultados: {len(firsts) + 1} páginas de {page_size}")
+        
+        # Uma conexão por thread, reutilizada entre as páginas
+        local = threading.local()
+        self._page_lock = threading.Lock()
+        self._page_connectors = []
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for first in firsts:
+                    pending.append(executor.submit(
+                        self._fetch_page, local, report_id, build_result_filter(first, page_size)
+                    ))
+                    # Consumir em ordem sem deixar páginas demais em memória
+                    if len(pending) >= workers:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+        finally:
+            for connector in self._page_connectors:
+                connector.disconnect()
+            self._page_connectors = []
+        
+    def _iter_report_results(self, report_id):
+        if OPENVAS_CONFIG.get('report_page_size', 1000) > 0:
+            yield from self.iter_report_pages(report_id)
+        else:
+            yield from self.stream_report(report_id, build_result_filter(1, -1))
+        
+    def iter_scan_results(self, task_id):
+        """Gera as vulnerabilidades do último relatório da task (memória constante)"""
+        report_id = self._get_last_report_id(task_id)
+        if not report_id:
+            return
+        yield from self._iter_report_results(report_id)
+        
+    def _cached_report(self, task_id):
+        """
+        Último relatório da task e, se já processado antes, seu DataFrame em cache
+        
+        Returns:
+            tuple: (report_id, chave de cache ou None, DataFrame ou None)
+        """
+        return lookup_cached_report(self.report_cache, self._get_last_report(task_id))
+        
+    def _cache_results(self, key, vulnerabilities):
+        """Grava o relatório processado no cache local (DataFrame compacto)"""
+        self.report_cache.put(key, build_frame(vulnerabilities))
+        
+    def get_scan_results(self, task_id):
+        """Obtém os resultados do scan"""
+        try:
+            report_id, key, cached = self._cached_report(task_id)
+            if cached is not None:
+                return frame_records(cached)
+            if not report_id:
                 return []
             
-            # Pegar último relatório
-            report_id = reports[-1].get('id')
-            report = gmp.get_report(report_id=report_id)
-            
-            vulnerabilities = []
-            
-            # Processar resultados
-            if hasattr(report, 'xpath'):
-                results = report.xpath('.//result')
-                for result in results:
-                    try:
-                        host_elem = result.find('host')
-                        nvt_elem = result.find('nvt')
-                        severity_elem = result.find('severity')
-                        
-                        if all([host_elem is not None, nvt_elem is not None, severity_elem is not None]):
-                            vuln = {
-                                'id': nvt_elem.get('oid', 'Unknown'),
-                                'name': nvt_elem.find('name').text if nvt_elem.find('name') is not None else 'Unknown',
-                                'host': host_elem.text,
-                                'severity': float(severity_elem.text) if severity_elem.text else 0.0,
-                                'description': result.find('description').text if result.find('description') is not None else 'N/A'
-                            }
-                            vulnerabilities.append(vuln)
-                    except Exception as e:
-                        print(f"⚠️ Erro ao processar resultado: {e}")
-                        continue
-            
+            vulnerabilities = list(self._iter_report_results(report_id))
             print(f"📋 Processados {len(vulnerabilities)} resultados")
+            if key:
+                self._cache_results(key, vulnerabilities)
             return vulnerabilities
-            
-        try:
-            return self._execute_gmp_command(_get_results)
         except Exception as e:
             print(f"❌ Erro ao obter resultados: {e}")
             return []
@@ -261,17 +813,16 @@ class OpenVASConnector:
             return []
         
         try:
-            # Criar target
-            target_name = f"AutoTarget_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            target_id = self.create_target(target_name, hosts)
+            # Reutilizar (ou criar) target/task para estes hosts
+            scan = self.get_or_create_task(hosts)
             
-            if not target_id:
+            if not scan:
                 return []
             
-            # Iniciar scan
-            task_id = self.start_scan(target_id)
+            task_id = scan['task_id']
             
-            if not task_id:
+            # Iniciar scan (se não estiver rodando de uma execução anterior)
+            if scan['status'] not in ACTIVE_TASK_STATUSES and not self.start_task(task_id):
                 return []
             
             # Aguardar conclusão
@@ -8,15 +8,17 @@ import sys
 
 # Importar configurações
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scanner.json_loader import batched, iter_json_batches
+from scanner.xml_importer import REPORT_EXTENSIONS, iter_report_directory, iter_report_file
 try:
     from alerting.email_config import get_mode, is_openvas_configured
-    from scanner.openvas_connector import run_openvas_scan
+    from scanner.scan_orchestrator import run_openvas_scan
     REAL_SCAN_AVAILABLE = True
 except ImportError:
     REAL_SCAN_AVAILABLE = False
     get_mode = lambda: 'development'
     is_openvas_configured = lambda: False
-    run_openvas_scan = lambda: None
+    run_openvas_scan = lambda target_hosts=None, on_results=None: None
 
 def load_scan_results():
     """
@@ -54,6 +56,48 @@ def load_scan_results():
     
     return get_simulated_vulnerabilities()
 
+def stream_scan_results(consumer):
+    """
+    Igual a load_scan_results, mas entrega os resultados em streaming
+
+    Args:
+        consumer: Função que recebe um iterável de vulnerabilidades e
+                  retorna quantas consumiu (ex.: StreamingReportWriter.consume)
+
+    Returns:
+        int: Total de vulnerabilidades entregues
+    """
+    mode = get_mode()
+    consumed = [0]
+
+    def _count(vulns):
+        count = consumer(vulns)
+        consumed[0] += count
+        return count
+
+    if mode == 'production' and REAL_SCAN_AVAILABLE and is_openvas_configured():
+        print("🔄 Modo PRODUCTION - Tentando conectar com OpenVAS real (streaming)...")
+
+        try:
+            run_openvas_scan(on_results=_count)
+            if consumed[0]:
+                print(f"✅ Scan real concluído: {consumed[0]} vulnerabilidades")
+                return consumed[0]
+            print("❌ OpenVAS não acessível ou sem resultados")
+            print("⚠️ Usando dados simulados como fallback")
+        except Exception as e:
+            print(f"❌ Erro na conexão com OpenVAS: {e}")
+            if consumed[0]:
+                # Parte dos resultados já foi entregue: não misturar com simulados
+                print(f"⚠️ Scan interrompido após {consumed[0]} vulnerabilidades")
+                return consumed[0]
+            print("⚠️ Usando dados simulados como fallback")
+
+    if mode == 'development':
+        print("🧪 Modo DEVELOPMENT - Usando dados simulados para aprendizado")
+
+    return _count(get_simulated_vulnerabilities())
+
 def get_simulated_vulnerabilities():
     """
     Retorna vulnerabilidades simuladas para aprendizado
@@ -112,25 +156,48 @@ def get_simulated_vulnerabilities():
     print(f"📋 Simulação carregada: {len(vulnerabilidades)} vulnerabilidades")
     return vulnerabilidades
 
+def iter_file_batches(path, batch_size=None):
+    """
+    Vulnerabilidades de um arquivo ou diretório exportado, em blocos
+
+    - Diretório: relatórios XML processados em paralelo (um bloco por relatório)
+    - .xml / .xml.gz: relatório exportado do GSA
+    - Demais: exportação JSON ou JSON Lines
+    """
+    if os.path.isdir(path):
+        yield from iter_report_directory(path)
+    elif path.endswith(REPORT_EXTENSIONS):
+        yield from batched(iter_report_file(path), batch_size)
+    else:
+        yield from iter_json_batches(path, batch_size)
+
 def load_from_file(filename="scan_results.json"):
     """
     Carrega vulnerabilidades de um arquivo JSON
     Útil para trabalhar com dados reais do OpenVAS exportados
+
+    Aceita array JSON ou JSON Lines (.gz também), relatórios XML do GSA
+    (.xml/.xml.gz) e diretórios de relatórios XML. Para exportações grandes,
+    prefira iter_file_batches, que entrega os registros em blocos sem
+    carregar o arquivo inteiro.
+
+    Raises:
+        FileNotFoundError, ResultFileError, ParseError: Erros de leitura não são mais
+        substituídos por dados simulados, para não mascarar cargas parciais
     """
+    vulnerabilities = []
     try:
-        import json
-        with open(filename, 'r') as f:
-            data = json.load(f)
-        
-        print(f"✅ Dados carregados de {filename}")
-        return data
-        
+        for batch in iter_file_batches(filename):
+            vulnerabilities.extend(batch)
     except FileNotFoundError:
-        print(f"❌ Arquivo {filename} não encontrado. Usando dados simulados.")
-        return get_simulated_vulnerabilities()
+        print(f"❌ Arquivo {filename} não encontrado")
+        raise
     except Exception as e:
-        print(f"❌ Erro ao carregar arquivo: {e}")
-        return get_simulated_vulnerabilities()
+        print(f"❌ Erro ao carregar {filename}: {e}")
+        raise
+
+    print(f"✅ Dados carregados de {filename}: {len(vulnerabilities)} vulnerabilidades")
+    return vulnerabilities
 
 if __name__ == "__main__":
     # Teste do módulo
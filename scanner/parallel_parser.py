@@ -0,0 +1,224 @@
+"""
+Parsing Paralelo de Relatórios XML
+Distribui relatórios (ou faixas de bytes de um relatório muito grande,
+cortadas entre elementos <result>) por um pool de processos; cada processo
+devolve um DataFrame compacto, concatenado no DataFrame de análise
+
+É o único caminho de importação paralela: main.py --import (parse_reports),
+main.py --stream <diretório> e load_from_file(<diretório>)
+(xml_importer.iter_report_directory) usam iter_report_frames
+"""
+
+import os
+import sys
+import mmap
+from functools import partial
+from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scanner.report_parser import ResultStreamParser
+from scanner.xml_importer import GZIP_MAGIC, READ_SIZE, find_report_files, iter_report_file
+from processing.vuln_analysis import build_frame
+
+# Tamanho mínimo de cada faixa ao dividir um relatório
+MIN_RANGE_BYTES = 8 << 20
+
+_RESULT_TAG = b'<result'
+_RESULT_END = b'</result>'
+_WHITESPACE = b' \t\r\n'
+
+
+def _is_compressed(path):
+    with open(path, 'rb') as f:
+        return f.read(2) == GZIP_MAGIC
+
+
+def _next_result(data, pos, end):
+    """
+    Posição do próximo <result> de primeiro nível a partir de pos
+
+    <result> aninhados (ex.: em <detection>) vêm logo após outra tag de
+    abertura; os de primeiro nível vêm logo após um </result>.
+    """
+    while True:
+        found = data.find(_RESULT_TAG, pos, end)
+        if found == -1:
+            return end
+        pos = found + len(_RESULT_TAG)
+        if data[pos:pos + 1] not in (b' ', b'>'):
+            continue  # <result_count>, <results>...
+
+        previous = found
+        while previous > 0 and data[previous - 1:previous] in _WHITESPACE:
+            previous -= 1
+        if data[previous - len(_RESULT_END):previous] == _RESULT_END:
+            return found
+
+
+def split_report(path, parts):
+    """
+    Divide o conteúdo de <results> de um relatório em até `parts` faixas de bytes
+
+    Cada faixa começa e termina em limites de <result> de primeiro nível.
+
+    Returns:
+        list: Tuplas (início, fim); vazia se o relatório não tiver resultados
+    """
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = data.find(b'<results')
+        if start == -1:
+            return []
+        start = data.find(b'>', start) + 1
+        end = data.rfind(b'</results>')
+        if data[start - 2:start] == b'/>' or end < start:
+            return []  # <results/>
+
+        step = (end - start) // max(parts, 1)
+        bounds = [start]
+        for index in range(1, parts):
+            bound = _next_result(data, max(start + index * step, bounds[-1] + 1), end)
+            if bound >= end:
+                break
+            if bound > bounds[-1]:
+                bounds.append(bound)
+        bounds.append(end)
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_range(path, begin, end):
+    """Executado no processo filho: resultados de uma faixa de bytes do relatório"""
+    parser = ResultStreamParser()
+    vulnerabilities = parser.feed(b'<results>')
+
+    with open(path, 'rb') as f:
+        f.seek(begin)
+        remaining = end - begin
+        while remaining > 0:
+            chunk = f.read(min(READ_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            vulnerabilities.extend(parser.feed(chunk))
+
+    vulnerabilities.extend(parser.feed(b'</results>'))
+    parser.close()
+    return build_frame(vulnerabilities)
+
+
+def _parse_file(path):
+    """Executado no processo filho: resultados de um relatório inteiro"""
+    return build_frame(list(iter_report_file(path)))
+
+
+def _plan(paths, workers, min_range_bytes):
+    """
+    Tarefas (caminho, função, argumentos) para o pool: faixas de arquivos
+    grandes ou arquivos inteiros, na ordem dos arquivos
+    """
+    tasks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        if _is_compressed(path) or size < 2 * min_range_bytes:
+            tasks.append((path, _parse_file, (path,)))
+            continue
+
+        parts = min(workers * 2, size // min_range_bytes)
+        tasks.extend((path, _parse_range, (path, begin, end)) for begin, end in split_report(path, parts))
+    return tasks
+
+
+def concat_frames(frames):
+    """
+    Concatena DataFrames de build_frame mantendo as colunas categóricas
+
+    pd.concat converteria categorias diferentes entre blocos em object,
+    desfazendo a compactação; aqui as categorias são unidas.
+    """
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+
+    columns = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            columns[column] = union_categoricals(parts, ignore_order=True)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def iter_report_frames(paths, workers=None, min_range_bytes=MIN_RANGE_BYTES, strict=True):
+    """
+    Lê relatórios XML em paralelo e entrega um DataFrame por relatório
+
+    Arquivos .xml grandes são divididos em faixas de bytes para que um único
+    relatório também use vários núcleos; .xml.gz é lido inteiro por um processo.
+    Os relatórios saem na ordem dos arquivos, cada um assim que suas faixas
+    terminam, sem esperar pelos seguintes.
+
+    Args:
+        paths: Arquivo, diretório ou lista de arquivos .xml/.xml.gz
+        workers: Processos simultâneos (padrão: número de CPUs)
+        min_range_bytes: Tamanho mínimo de cada faixa de um relatório
+        strict: Se False, relatórios com erro são avisados e ignorados
+
+    Yields:
+        tuple: (caminho, DataFrame no formato de build_frame)
+    """
+    if isinstance(paths, str):
+        paths = find_report_files(paths) if os.path.isdir(paths) else [paths]
+
+    workers = workers or os.cpu_count() or 1
+    tasks = _plan(paths, workers, min_range_bytes)
+    if not tasks:
+        return
+
+    executor = None
+    if workers == 1 or len(tasks) == 1:
+        # Sem pool: cada tarefa roda no próprio processo quando for consumida
+        results = [partial(function, *args) for _, function, args in tasks]
+    else:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(tasks)))
+        results = [executor.submit(function, *args).result for _, function, args in tasks]
+
+    failed = []
+    try:
+        for path, group in groupby(zip(tasks, results), key=lambda item: item[0][0]):
+            try:
+                frames = [result() for _, result in group]
+            except Exception as e:
+                if strict:
+                    raise Exception(f"Falha ao importar {path}: {e}") from e
+                print(f"❌ {os.path.basename(path)}: {e}")
+                failed.append(path)
+                continue
+            yield path, concat_frames(frames)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if failed:
+        print(f"⚠️ {len(failed)} de {len(paths)} relatórios não puderam ser importados")
+
+
+def parse_reports(paths, workers=None, min_range_bytes=MIN_RANGE_BYTES):
+    """
+    Lê relatórios XML em paralelo e monta o DataFrame de análise
+
+    Args:
+        paths: Arquivo, diretório ou lista de arquivos .xml/.xml.gz
+        workers: Processos simultâneos (padrão: número de CPUs)
+        min_range_bytes: Tamanho mínimo de cada faixa de um relatório
+
+    Returns:
+        DataFrame: Vulnerabilidades (mesmo formato de build_frame)
+    """
+    return concat_frames(frame for _, frame in iter_report_frames(paths, workers, min_range_bytes))
@@ -0,0 +1,121 @@
+"""
+Cache de Relatórios Processados
+Guarda em disco o DataFrame de resultados de cada relatório já baixado
+(chave: ID do relatório + data de modificação + filtro), em formato binário
+colunar, com limite de tamanho e descarte dos menos usados (LRU)
+"""
+
+import os
+import sys
+import hashlib
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from alerting.email_config import REPORT_CONFIG
+except ImportError:
+    REPORT_CONFIG = {}
+
+# Feather (Arrow IPC) carrega em milissegundos; sem pyarrow, pickle do pandas
+try:
+    import pyarrow  # noqa: F401
+    CACHE_EXTENSION = '.feather'
+except ImportError:
+    CACHE_EXTENSION = '.pkl'
+
+# Entrada com a última análise completa de main.py (reutilizada por --quick)
+LATEST_KEY = 'latest'
+
+
+def report_key(report_id, modified, filter_string=''):
+    """
+    Chave de um relatório processado
+
+    A data de modificação invalida o cache se o relatório mudar; o filtro
+    entra na chave porque define quais resultados foram baixados.
+    """
+    digest = hashlib.sha256(f"{report_id}|{modified}|{filter_string}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """
+    Diretório de DataFrames processados, limitado a max_mb (LRU pelo último acesso)
+    """
+
+    def __init__(self, directory=None, max_mb=None):
+        self.directory = directory or REPORT_CONFIG.get('cache_dir', 'reports/cache')
+        max_mb = max_mb if max_mb is not None else REPORT_CONFIG.get('cache_max_mb', 512)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}{CACHE_EXTENSION}")
+
+    def get(self, key):
+        """
+        DataFrame em cache para a chave, ou None
+
+        Cada leitura atualiza o horário de acesso usado pelo descarte LRU.
+        """
+        path = self._path(key)
+        try:
+            if CACHE_EXTENSION == '.feather':
+                df = pd.read_feather(path)
+            else:
+                df = pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Entrada de cache inválida ({e}) - descartando")
+            self.remove(key)
+            return None
+
+        os.utime(path)
+        return df
+
+    def put(self, key, df):
+        """Grava o DataFrame (de forma atômica) e aplica o limite de tamanho"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+
+        try:
+            if CACHE_EXTENSION == '.feather':
+                # lz4: compressão leve, leitura quase tão rápida quanto sem compressão
+                df.reset_index(drop=True).to_feather(tmp_path, compression='lz4')
+            else:
+                df.to_pickle(tmp_path, compression=None)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ Erro ao gravar cache de relatório: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self.evict(keep=path)
+
+    def remove(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self, keep=None):
+        """Remove as entradas acessadas há mais tempo até caber em max_bytes"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(CACHE_EXTENSION)]
+        except FileNotFoundError:
+            return
+
+        entries = sorted(((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries))
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue  # a entrada recém-gravada fica, mesmo maior que o limite
+            os.remove(path)
+            total -= size
@@ -0,0 +1,136 @@
+"""
+Parser Incremental de Relatórios OpenVAS
+Lê o XML do relatório em pedaços e gera uma vulnerabilidade por vez,
+descartando cada <result> depois de processado (memória limitada a um resultado)
+"""
+
+import xml.etree.ElementTree as ET
+
+
+def parse_result(result):
+    """
+    Converte um elemento <result> do GMP em dicionário de vulnerabilidade
+
+    Returns:
+        dict ou None se o resultado não tiver host, NVT ou severidade
+    """
+    host_elem = result.find('host')
+    nvt_elem = result.find('nvt')
+    severity_elem = result.find('severity')
+
+    if host_elem is None or nvt_elem is None or severity_elem is None:
+        return None
+
+    return {
+        'id': nvt_elem.get('oid', 'Unknown'),
+        'name': nvt_elem.findtext('name', 'Unknown'),
+        'host': (host_elem.text or '').strip(),
+        'port': result.findtext('port', 'N/A'),
+        'severity': float(severity_elem.text) if severity_elem.text else 0.0,
+        'description': result.findtext('description', 'N/A')
+    }
+
+
+class ResultStreamParser:
+    """
+    Parser incremental alimentado por pedaços (bytes) de um relatório XML
+
+    Usado tanto por iter_results (leitura síncrona) quanto pelo conector
+    assíncrono, que alimenta o parser conforme os dados chegam do socket.
+    """
+
+    def __init__(self, summary=None):
+        self.parser = ET.XMLPullParser(events=('start', 'end'))
+        self.summary = summary
+        self.stack = []
+        self.result_depth = None  # profundidade do <result> sendo lido
+        self.finished = False     # elemento raiz já foi fechado
+
+    def feed(self, chunk):
+        """
+        Processa mais um pedaço do XML
+
+        Returns:
+            list: Vulnerabilidades completadas por este pedaço
+        """
+        self.parser.feed(chunk)
+        vulnerabilities = []
+        stack = self.stack
+
+        for event, elem in self.parser.read_events():
+            if event == 'start':
+                if not stack:
+                    _check_response_status(elem)
+                if self.result_depth is None and elem.tag == 'result' and stack and stack[-1].tag == 'results':
+                    self.result_depth = len(stack)
+                stack.append(elem)
+                continue
+
+            stack.pop()
+
+            if self.result_depth is not None:
+                # Ainda dentro do <result> (ex: <detection><result>)
+                if len(stack) != self.result_depth:
+                    continue
+                self.result_depth = None
+
+                try:
+                    vuln = parse_result(elem)
+                except Exception as e:
+                    print(f"⚠️ Erro ao processar resultado: {e}")
+                    vuln = None
+                if vuln is not None:
+                    vulnerabilities.append(vuln)
+
+            elif (self.summary is not None and elem.tag == 'filtered'
+                  and stack and stack[-1].tag == 'result_count'):
+                # Lido no próprio fechamento: ao fechar <result_count> os
+                # filhos já foram descartados abaixo
+                filtered = (elem.text or '').strip()
+                if filtered.isdigit():
+                    self.summary['filtered'] = int(filtered)
+
+            # Descartar elementos já processados para não acumular a árvore
+            if stack:
+                stack[-1].remove(elem)
+            else:
+                self.finished = True
+
+        return vulnerabilities
+
+    def close(self):
+        """Finaliza o parser (erro se o XML estiver incompleto)"""
+        self.parser.close()
+
+
+def iter_results(chunks, summary=None):
+    """
+    Gera vulnerabilidades a partir de pedaços (bytes) de um relatório XML
+
+    Funciona tanto com a resposta bruta de <get_report> quanto com um
+    relatório exportado. Para de consumir `chunks` assim que o elemento
+    raiz é fechado, então pode ser usado diretamente sobre um socket.
+
+    Args:
+        chunks: Iterável de bytes com o XML do relatório
+        summary: Dicionário opcional preenchido com a contagem de resultados
+            do relatório (chave 'filtered'), útil para paginação
+
+    Yields:
+        dict: Vulnerabilidade no mesmo formato de load_scan_results (+ port)
+    """
+    parser = ResultStreamParser(summary)
+
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.finished:
+            break
+
+    parser.close()
+
+
+def _check_response_status(root):
+    """Levanta erro se a resposta GMP indicar falha (status != 2xx)"""
+    status = root.get('status')
+    if status is not None and not status.startswith('2'):
+        raise Exception(f"Erro GMP {status}: {root.get('status_text', 'Unknown')}")
@@ -0,0 +1,250 @@
+"""
+Orquestrador de Scans - Vários Targets em Paralelo
+Cria targets/tasks para várias redes, acompanha todas juntas e
+coleta cada relatório assim que a task correspondente termina
+"""
+
+import os
+import sys
+import time
+import ipaddress
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scanner.openvas_connector import (
+    OpenVASConnector, OPENVAS_CONFIG, ACTIVE_TASK_STATUSES, get_mode, is_openvas_configured
+)
+from scanner.adaptive_poller import AdaptivePoller
+
+# Estados em que a task ocupa uma vaga no scanner (conta para max_concurrent)
+BUSY_STATES = ('running', 'stopping')
+
+# Segundos aguardando o gvmd parar uma task após o timeout
+STOP_WAIT = 300
+
+
+def split_targets(hosts=None, chunk_prefix=None):
+    """
+    Divide a lista de targets em blocos menores
+
+    Args:
+        hosts: String separada por vírgulas (formato TARGET_HOSTS) ou lista
+        chunk_prefix: Prefixo máximo de cada bloco (ex: 24 divide /16 em 256 /24)
+
+    Returns:
+        list: Targets prontos para virarem targets no OpenVAS
+    """
+    if hosts is None:
+        hosts = OPENVAS_CONFIG['target_hosts']
+    if chunk_prefix is None:
+        chunk_prefix = OPENVAS_CONFIG.get('target_chunk_prefix', 24)
+    if isinstance(hosts, str):
+        hosts = hosts.split(',')
+
+    targets = []
+    for host in hosts:
+        host = host.strip()
+        if not host:
+            continue
+
+        try:
+            network = ipaddress.ip_network(host, strict=False)
+        except ValueError:
+            # Hostname ou intervalo - mantém como está
+            targets.append(host)
+            continue
+
+        if network.version == 4 and network.prefixlen < chunk_prefix:
+            targets.extend(str(subnet) for subnet in network.subnets(new_prefix=chunk_prefix))
+        else:
+            targets.append(str(network))
+
+    return targets
+
+
+class ScanOrchestrator:
+    """
+    Executa scans de vários targets com limite de tasks simultâneas
+    """
+
+    def __init__(self, connector=None, max_concurrent=None, poll_interval=None, max_wait=None, on_results=None):
+        self.connector = connector or OpenVASConnector()
+        self.max_concurrent = max_concurrent or OPENVAS_CONFIG.get('max_concurrent_tasks', 4)
+        self.poll_interval = poll_interval  # None = intervalo adaptativo pelo progresso
+        # Tempo máximo por task, contado a partir do início
+        self.max_wait = max_wait or OPENVAS_CONFIG.get('max_wait', 1800)
+        # Consumidor dos resultados em streaming (recebe um iterável, retorna a quantidade);
+        # sem ele, os resultados de cada task ficam em memória para merge_results()
+        self.on_results = on_results
+        self.jobs = []
+
+    def prepare(self, targets):
+        """Reutiliza ou cria target e task (sem iniciar) para cada host/bloco"""
+        for hosts in targets:
+            scan = self.connector.get_or_create_task(hosts)
+            if not scan:
+                continue
+
+            # Task ainda rodando de uma execução anterior: só acompanhar
+            active = scan['status'] in ACTIVE_TASK_STATUSES
+            self.jobs.append({
+                'hosts': hosts,
+                'target_id': scan['target_id'],
+                'task_id': scan['task_id'],
+                'state': 'running' if active else 'pending',
+                'started_at': time.time() if active else None,
+                'poller': AdaptivePoller(),
+                'results': [],
+                'result_count': 0
+            })
+
+        print(f"📋 {len(self.jobs)} de {len(targets)} tasks preparadas")
+        return self.jobs
+
+    def _start_pending(self):
+        """Inicia tasks pendentes até atingir o limite de simultâneas"""
+        # Tasks paradas por timeout seguem ocupando vaga até o gvmd confirmar
+        running = sum(1 for job in self.jobs if job['state'] in BUSY_STATES)
+
+        for job in self.jobs:
+            if running >= self.max_concurrent:
+                break
+            if job['state'] != 'pending':
+                continue
+
+            if self.connector.start_task(job['task_id']):
+                job['state'] = 'running'
+                job['started_at'] = time.time()
+                running += 1
+            else:
+                job['state'] = 'failed'
+
+    def _stop_job(self, job):
+        """Pede ao gvmd para parar a task (repetido a cada consulta se falhar)"""
+        if job['state'] != 'stopping':
+            job['state'] = 'stopping'
+            job['stop_requested_at'] = time.time()
+        job['stop_sent'] = self.connector.stop_task(job['task_id'])
+
+    def _poll_stopping(self, job, status):
+        """Task parada por timeout: libera a vaga quando o gvmd confirmar"""
+        if status not in ACTIVE_TASK_STATUSES + ["Stop Requested"]:
+            job['state'] = 'timeout'
+            print(f"⏹️ {job['hosts']}: task parada após timeout ({status})")
+        elif time.time() - job['stop_requested_at'] > STOP_WAIT:
+            job['state'] = 'timeout'
+            print(f"⚠️ {job['hosts']}: gvmd não parou a task em {STOP_WAIT}s - liberando a vaga ({status})")
+        elif not job['stop_sent']:
+            self._stop_job(job)
+
+    def _poll_running(self):
+        """Verifica as tasks em execução e coleta as que terminaram"""
+        running = [job for job in self.jobs if job['state'] in BUSY_STATES]
+        # Uma única consulta para todas as tasks, independente da quantidade
+        statuses = self.connector.get_tasks_status(job['task_id'] for job in running)
+
+        for job in running:
+            status, progress = statuses.get(job['task_id'], ("Unknown", "0"))
+
+            if job['state'] == 'stopping':
+                self._poll_stopping(job, status)
+            elif status in ["Done", "Stopped"]:
+                if self.on_results:
+                    job['result_count'] = self.on_results(self.connector.iter_scan_results(job['task_id']))
+                else:
+                    job['results'] = self.connector.get_scan_results(job['task_id'])
+                    job['result_count'] = len(job['results'])
+                job['state'] = 'done'
+                print(f"✅ {job['hosts']}: {status} - {job['result_count']} vulnerabilidades")
+            elif status == "Interrupted":
+                job['state'] = 'failed'
+                print(f"❌ {job['hosts']}: {status}")
+            elif time.time() - job['started_at'] > self.max_wait:
+                # Parar no gvmd: senão a task segue rodando e outra seria iniciada
+                print(f"⏰ {job['hosts']}: timeout aguardando conclusão - parando a task")
+                self._stop_job(job)
+            else:
+                job['poller'].update(progress)
+                print(f"📊 {job['hosts']}: {status} | Progresso: {progress}% | ETA: {job['poller'].format_eta()}")
+
+    def _next_poll_interval(self):
+        """Menor intervalo sugerido entre as tasks em execução"""
+        if self.poll_interval is not None:
+            return self.poll_interval
+
+        intervals = [job['poller'].interval or job['poller'].min_interval
+                     for job in self.jobs if job['state'] in BUSY_STATES]
+        return min(intervals) if intervals else 0
+
+    def run(self, targets=None):
+        """
+        Executa o scan de todos os targets
+
+        Returns:
+            list: Vulnerabilidades de todos os targets (mesmo formato de load_scan_results)
+        """
+        if targets is None:
+            targets = split_targets()
+
+        print(f"🎯 Iniciando scan de {len(targets)} targets (máx. {self.max_concurrent} simultâneos)")
+
+        if not self.connector.connect():
+            return []
+
+        try:
+            self.prepare(targets)
+
+            while True:
+                self._start_pending()
+                if not any(job['state'] == 'pending' or job['state'] in BUSY_STATES for job in self.jobs):
+                    break
+
+                time.sleep(self._next_poll_interval())
+                self._poll_running()
+
+            return self.merge_results()
+
+        except Exception as e:
+            print(f"❌ Erro durante scan: {e}")
+            return self.merge_results()
+        finally:
+            self.connector.disconnect()
+
+    def merge_results(self):
+        """Junta as vulnerabilidades de todas as tasks concluídas"""
+        vulnerabilities = []
+        for job in self.jobs:
+            vulnerabilities.extend(job['results'])
+
+        done = sum(1 for job in self.jobs if job['state'] == 'done')
+        total = sum(job['result_count'] for job in self.jobs)
+        print(f"✅ {done}/{len(self.jobs)} tasks concluídas: {total} vulnerabilidades")
+        return vulnerabilities
+
+
+def run_openvas_scan(target_hosts=None, on_results=None, max_wait=None):
+    """
+    Executa scan completo no OpenVAS
+    Retorna lista de vulnerabilidades encontradas
+
+    Com on_results, os resultados de cada task são entregues a ele em
+    streaming e a lista retornada fica vazia. `max_wait` (segundos por task)
+    vem de OPENVAS_MAX_WAIT quando não informado.
+    """
+    if get_mode() != 'production':
+        print("ℹ️ Modo development - usando dados simulados")
+        return None
+
+    if not is_openvas_configured():
+        print("❌ OpenVAS não configurado adequadamente")
+        return None
+
+    orchestrator = ScanOrchestrator(max_wait=max_wait, on_results=on_results)
+    return orchestrator.run(split_targets(target_hosts))
+
+
+if __name__ == "__main__":
+    results = run_openvas_scan()
+    if results:
+        print(f"✅ Scan concluído! {len(results)} vulnerabilidades encontradas")
+        for vuln in results[:3]:
+            print(f"  • {vuln['name']} - Severidade: {vuln['severity']}")
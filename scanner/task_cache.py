@@ -0,0 +1,65 @@
+"""
+Cache de Targets/Tasks do OpenVAS
+Guarda em arquivo local qual target/task já existe para cada conjunto de
+hosts + configuração de scan, para reutilizar em vez de criar novos
+"""
+
+import os
+import json
+import hashlib
+
+
+def scan_key(hosts, config_id, scanner_id):
+    """
+    Chave estável para um conjunto de hosts e configuração de scan
+
+    A ordem e espaços dos hosts não alteram a chave.
+    """
+    if isinstance(hosts, str):
+        hosts = hosts.split(',')
+    normalized = ','.join(sorted(host.strip() for host in hosts if host.strip()))
+
+    digest = hashlib.sha256(f"{normalized}|{config_id}|{scanner_id}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TaskCache:
+    """
+    Mapeamento persistente chave -> {target_id, task_id, hosts}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️ Cache de tasks inválido ({e}) - recriando")
+            return {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, entry):
+        self.entries[key] = entry
+        self.save()
+
+    def remove(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.save()
+
+    def save(self):
+        """Grava o cache de forma atômica (arquivo temporário + rename)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,132 @@
+"""
+Importação de Relatórios XML do OpenVAS (sem conexão GMP)
+Lê relatórios exportados pelo GSA (.xml ou .xml.gz) com o mesmo parser
+incremental do conector e processa diretórios inteiros em paralelo
+(pool de processos de parallel_parser)
+"""
+
+import os
+import sys
+import gzip
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scanner.report_parser import iter_results
+
+# Tamanho de cada leitura do arquivo (bytes)
+READ_SIZE = 1 << 20
+
+# Extensões reconhecidas ao importar um diretório
+REPORT_EXTENSIONS = ('.xml', '.xml.gz')
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def _open_report(path):
+    """Abre o relatório em modo binário, descompactando gzip pelo conteúdo"""
+    with open(path, 'rb') as f:
+        compressed = f.read(2) == GZIP_MAGIC
+    return gzip.open(path, 'rb') if compressed else open(path, 'rb')
+
+
+def _iter_chunks(f):
+    while True:
+        chunk = f.read(READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_report_file(path):
+    """
+    Gera as vulnerabilidades de um relatório XML exportado, uma por vez
+
+    Args:
+        path: Arquivo .xml ou .xml.gz (relatório do GSA ou resposta de <get_report>)
+
+    Yields:
+        dict: Vulnerabilidade no mesmo formato de load_scan_results
+    """
+    with _open_report(path) as f:
+        yield from iter_results(_iter_chunks(f))
+
+
+def import_report_file(path):
+    """Importa um relatório XML inteiro para uma lista"""
+    vulnerabilities = list(iter_report_file(path))
+    print(f"✅ {os.path.basename(path)}: {len(vulnerabilities)} vulnerabilidades")
+    return vulnerabilities
+
+
+def find_report_files(directory):
+    """Relatórios XML do diretório (recursivo), em ordem de nome"""
+    files = []
+    for dirpath, _, filenames in os.walk(directory):
+        files.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(REPORT_EXTENSIONS))
+    return sorted(files)
+
+
+def iter_report_directory(directory, workers=None, strict=False):
+    """
+    Importa todos os relatórios de um diretório em paralelo
+
+    Usa o mesmo pool de parallel_parser.iter_report_frames (relatórios
+    grandes divididos em faixas entre processos); os resultados de cada
+    arquivo são entregues assim que ele termina, na ordem dos arquivos.
+
+    Args:
+        directory: Diretório com relatórios .xml/.xml.gz
+        workers: Processos simultâneos (padrão: número de CPUs)
+        strict: Se True, interrompe no primeiro arquivo com erro
+
+    Yields:
+        list: Vulnerabilidades de um relatório
+    """
+    # Importação tardia: parallel_parser importa este módulo
+    from scanner.parallel_parser import iter_report_frames
+    from processing.vuln_analysis import frame_records
+
+    files = find_report_files(directory)
+    if not files:
+        print(f"⚠️ Nenhum relatório XML encontrado em {directory}")
+        return
+
+    # Sem limitar ao número de arquivos: um relatório grande usa vários processos
+    workers = workers or os.cpu_count() or 1
+    print(f"📂 Importando {len(files)} relatórios com {workers} processos...")
+
+    for path, frame in iter_report_frames(files, workers, strict=strict):
+        vulnerabilities = frame_records(frame)
+        print(f"✅ {os.path.basename(path)}: {len(vulnerabilities)} vulnerabilidades")
+        yield vulnerabilities
+
+
+def import_report_directory(directory, workers=None, strict=False):
+    """
+    Importa e junta os relatórios XML de um diretório
+
+    Returns:
+        list: Vulnerabilidades de todos os relatórios importados
+    """
+    vulnerabilities = []
+    for batch in iter_report_directory(directory, workers, strict):
+        vulnerabilities.extend(batch)
+
+    print(f"📋 Total importado: {len(vulnerabilities)} vulnerabilidades")
+    return vulnerabilities
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Importa relatórios XML exportados do OpenVAS/GSA")
+    parser.add_argument('path', help="Arquivo .xml/.xml.gz ou diretório de relatórios")
+    parser.add_argument('--workers', type=int, default=None, help="Processos simultâneos (diretório)")
+    args = parser.parse_args()
+
+    if os.path.isdir(args.path):
+        results = import_report_directory(args.path, args.workers)
+    else:
+        results = import_report_file(args.path)
+
+    for vuln in results[:3]:
+        print(f"  • {vuln['name']} | {vuln['host']} | Severidade: {vuln['severity']}")